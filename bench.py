@@ -0,0 +1,339 @@
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from cpu import CPU
+from frontend import Headless
+from instruction import SimpleInstr, instrs, cbinstrs
+from mbc import MBC
+from mmu import MMU, ALL_TILES
+from ppu import PPU, make_ppu
+from recompiler import Recompiler
+import savestate
+
+# Microbenchmarks for the hot paths, no ROM or window needed:
+#   python bench.py            run everything
+#   python bench.py opcodes    run one
+
+BENCHMARKS: Dict[str, Callable[[], None]] = {}
+REPEAT = 5000
+
+
+def benchmark(fn: Callable[[], None]) -> Callable[[], None]:
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+
+def make_cpu() -> CPU:
+    ui = Headless()
+    mem = MMU(ui, MBC("bench.gb"))
+    return CPU(mem, PPU(ui, mem), ui)
+
+
+def reset(cpu: CPU) -> None:
+    cpu.r.A, cpu.r.B, cpu.r.C, cpu.r.D, cpu.r.E = 0x12, 0x34, 0x56, 0x78, 0x9A
+    cpu.r.HL = 0xC000
+    cpu.r.SP = 0xD000
+    cpu.r.PC = 0x0150
+    cpu.r.F = 0x00
+    cpu.r.IME = True
+
+
+def time_instr(cpu: CPU, i: SimpleInstr) -> float:
+    # ns per call of a single handler
+    op = i.op
+    arg = 0xC123 if i.argbytes == 2 else 0x42
+    reset(cpu)
+    start = time.perf_counter_ns()
+    for _ in range(REPEAT):
+        op(cpu, arg)
+    return (time.perf_counter_ns() - start) / REPEAT
+
+
+@benchmark
+def opcodes() -> None:
+    cpu = make_cpu()
+    results: List[Tuple[float, str]] = []
+    for table, prefix in ((instrs, ""), (cbinstrs, "CB ")):
+        for i in table.values():
+            if table is instrs and i.value == 0xCB:
+                continue
+            results.append((time_instr(cpu, i), prefix + str(i)))
+
+    main = [ns for ns, name in results if not name.startswith("CB ")]
+    cb = [ns for ns, name in results if name.startswith("CB ")]
+    print(f"opcodes: {sum(main) / len(main):6.1f} ns/opcode ({len(main)} opcodes)")
+    print(f"cb:      {sum(cb) / len(cb):6.1f} ns/opcode ({len(cb)} opcodes)")
+    print("slowest:")
+    for ns, name in sorted(results, reverse=True)[:8]:
+        print(f"  {ns:6.1f} ns  {name}")
+
+
+# Register-heavy mixes: 8-bit moves/ALU, 16-bit pair arithmetic, stack
+MIXES = {
+    "alu8":  (0x41, 0x04, 0x80, 0x0D, 0xA9, 0x57, 0x3C, 0x90, 0xB1, 0x2F),
+    "pair16": (0x03, 0x13, 0x23, 0x0B, 0x1B, 0x09, 0x19, 0x29, 0x33, 0x3B),
+    "stack": (0xC5, 0xD5, 0xE5, 0xF5, 0xF1, 0xE1, 0xD1, 0xC1),
+}
+
+
+def best_ns(fn: Callable[[], None], count: int) -> float:
+    # Best of a few rounds, ns per unit of work; this box is noisy
+    times = []
+    for _ in range(5):
+        start = time.perf_counter_ns()
+        fn()
+        times.append(time.perf_counter_ns() - start)
+    return min(times) / count
+
+
+@benchmark
+def registers() -> None:
+    cpu = make_cpu()
+    r = cpu.reg
+    for name, mix in MIXES.items():
+        ops = [instrs[op].op for op in mix]
+        reset(cpu)
+
+        def run_mix() -> None:
+            for _ in range(REPEAT):
+                for op in ops:
+                    op(cpu, 0x42)
+        print(f"{name + ':':8} {best_ns(run_mix, REPEAT * len(ops)):6.1f} ns/opcode")
+
+    def pairs() -> None:
+        for _ in range(REPEAT):
+            r.HL = r.BC + r.DE
+            r.AF = r.HL
+    print(f"{'pairs:':8} {best_ns(pairs, REPEAT * 2):6.1f} ns/access")
+
+    def state() -> None:
+        for _ in range(REPEAT):
+            r.load_state(r.save_state())
+    print(f"{'state:':8} {best_ns(state, REPEAT):6.1f} ns/save+load")
+
+
+# ADD A,B; ADC A,C; SUB D; XOR E; INC L; DEC C; RLCA; CP 0x42; AND 0x0F;
+# OR B; SBC A,E; DEC B; JP 0xC100
+ALU_BLOCK = bytes((0x80, 0x89, 0x92, 0xAB, 0x2C, 0x0D, 0x07, 0xFE, 0x42, 0xE6, 0x0F,
+                   0xB0, 0x9B, 0x05, 0xC3, 0x00, 0xC1))
+
+
+@benchmark
+def flags() -> None:
+    for lazy in (False, True):
+        cpu = make_cpu()
+        recompiler = Recompiler(cpu, lazy)
+        cpu.mem.mem[0xC100:0xC100 + len(ALU_BLOCK)] = ALU_BLOCK
+        reset(cpu)
+        block = recompiler.compile(0xC100, 0xC100)
+
+        def run_block() -> None:
+            for _ in range(REPEAT):
+                block(cpu)
+        ns = best_ns(run_block, REPEAT * 13)
+        print(f"{'lazy:' if lazy else 'eager:':8} {ns:6.1f} ns/opcode ({recompiler.flags_dropped} flag writes dropped)")
+
+
+# INC A; DEC B; LD C,A; JR -5: 4 instructions, 24 cycles
+LOOP = bytes((0x3C, 0x05, 0x4F, 0x18, 0xFB))
+
+
+def idle_cpu(program: bytes, at: int = 0xC000) -> CPU:
+    # LCD off, interrupts off, running program from WRAM
+    cpu = make_cpu()
+    cpu.mem.mem[at:at + len(program)] = program
+    reset(cpu)
+    cpu.r.PC = at
+    cpu.r.IME = False
+    cpu.mem.mem[0xFFFF] = 0x00  # IE
+    cpu.mem[0xFF40] = 0x00      # LCDC
+    return cpu
+
+
+def time_run(program: bytes, cycles: int, at: int = 0xC000, idle: bool = True) -> float:
+    # Best of 5 fresh machines, kept short of the LCD-off frame flush
+    times = []
+    for _ in range(5):
+        cpu = idle_cpu(program, at)
+        cpu.idle_loops.enabled = idle
+        cpu.remaining_cycles = cycles
+        start = time.perf_counter_ns()
+        cpu.run()
+        times.append(time.perf_counter_ns() - start)
+    return min(times)
+
+
+@benchmark
+def dispatch() -> None:
+    # Whole run loop: instruction fetch and decode plus whatever
+    # peripheral work each instruction pays for
+    ns = time_run(LOOP, 60000)
+    print(f"{'loop:':8} {ns / (60000 / 6):6.1f} ns/instruction")
+
+
+@benchmark
+def halt() -> None:
+    # HALT with nothing to wake it: 60000 cycles of waiting
+    ns = time_run(bytes((0x76, 0x18, 0xFD)), 60000)
+    print(f"{'halt:':8} {ns / 1000:6.1f} us per 60000 cycles")
+
+
+# LD A,(HL) and LD (HL),A, by region
+REGIONS = {"rom": 0x0150, "vram": 0x8123, "wram": 0xC123, "echo": 0xE123, "hram": 0xFF90, "io": 0xFF42}
+
+
+@benchmark
+def memory() -> None:
+    cpu = make_cpu()
+    load, store = instrs[0x7E].op, instrs[0x77].op
+    for name, addr in REGIONS.items():
+        reset(cpu)
+        cpu.r.HL = addr
+
+        def read() -> None:
+            for _ in range(REPEAT):
+                load(cpu, 0)
+
+        def write() -> None:
+            for _ in range(REPEAT):
+                store(cpu, 0)
+        line = f"{name + ':':8} {best_ns(read, REPEAT):6.1f} ns/read"
+        if addr >= 0x8000:
+            line += f" {best_ns(write, REPEAT):6.1f} ns/write"
+        print(line)
+
+
+# LDH A,(n) and LDH (n),A over a game's usual registers: joypad, DIV,
+# IF, LCDC, STAT, SCY/SCX, LY, BGP, IE and HRAM
+IO_READS = (0x00, 0x04, 0x0F, 0x41, 0x44, 0x44, 0x44, 0x80, 0xFF)
+IO_WRITES = (0x00, 0x0F, 0x40, 0x42, 0x43, 0x47, 0x80)
+
+
+@benchmark
+def io() -> None:
+    cpu = make_cpu()
+    load, store = instrs[0xF0].op, instrs[0xE0].op
+    reset(cpu)
+    cpu.r.A = 0x91  # keeps the LCD on when written to LCDC
+
+    def mix() -> None:
+        for _ in range(REPEAT // 10):
+            for n in IO_READS:
+                load(cpu, n)
+            cpu.r.A = 0x91
+            for n in IO_WRITES:
+                store(cpu, n)
+    print(f"{'io:':8} {best_ns(mix, REPEAT // 10 * (len(IO_READS) + len(IO_WRITES))):6.1f} ns/access")
+
+
+# LDH A,(44); CP 0x90; JR NZ,-6: waiting for VBlank, from ROM
+POLL = bytes((0xF0, 0x44, 0xFE, 0x90, 0x20, 0xFA))
+
+
+@benchmark
+def idle() -> None:
+    for enabled in (False, True):
+        ns = time_run(POLL, 60000, 0x0150, enabled)
+        print(f"{'skip:' if enabled else 'run:':8} {ns / 1000:6.1f} us per 60000 cycles of polling")
+
+
+@benchmark
+def tiles() -> None:
+    # Tile decoding with every tile written, and with nothing written
+    cpu = make_cpu()
+    ppu, mem = cpu.ppu, cpu.mem
+
+    def all_tiles() -> None:
+        for _ in range(REPEAT // 100):
+            mem.dirty_tiles = ALL_TILES
+            ppu.decode_tiles()
+
+    def clean() -> None:
+        for _ in range(REPEAT):
+            ppu.decode_tiles()
+    print(f"{'all:':8} {best_ns(all_tiles, REPEAT // 100) / 1000:6.1f} us per 384 tiles")
+    print(f"{'clean:':8} {best_ns(clean, REPEAT):6.1f} ns per scanline")
+
+
+@benchmark
+def scanline() -> None:
+    # Scrolled background with the window over the right half, no sprites
+    cpu = make_cpu()
+    ppu, mem = cpu.ppu, cpu.mem
+    mem.OAM[:] = bytes(0xA0)
+    for addr, val in ((0xFF40, 0xF1), (0xFF42, 0x2D), (0xFF43, 0x13), (0xFF4A, 0), (0xFF4B, 87)):
+        mem[addr] = val
+    ppu.decode_tiles()
+    for name in ("render_scanline", "render_scanline_pixels"):
+        render = getattr(ppu, name)
+
+        def lines() -> None:
+            for y in range(144):
+                render(y)
+            ppu.ly_window = -1
+        print(f"{name + ':':24} {best_ns(lines, 144) / 1000:6.1f} us/line")
+
+
+@benchmark
+def sprites() -> None:
+    # 40 8x8 sprites in rows of 5, flips and palettes mixed
+    cpu = make_cpu()
+    ppu, mem = cpu.ppu, cpu.mem
+    for n in range(40):
+        for i, val in enumerate((16 + n // 5 * 18, 8 + n % 5 * 30, n, (n * 0x30) & 0xF0)):
+            mem[0xFE00 + 4*n + i] = val
+    mem[0xFF40] = 0x93
+    ppu.decode_tiles()
+
+    def lines() -> None:
+        for y in range(144):
+            ppu.render_sprites(y)
+    print(f"{'sprites:':8} {best_ns(lines, 144) / 1000:6.1f} us/line")
+
+    def reindex() -> None:
+        for _ in range(100):
+            ppu.index_sprites()
+    print(f"{'index:':8} {best_ns(reindex, 100) / 1000:6.1f} us per OAM change")
+
+
+@benchmark
+def backends() -> None:
+    # A whole frame with 40 sprites, nothing changing mid-frame
+    for numpy in (False, True):
+        ui = Headless()
+        mem = MMU(ui, MBC("bench.gb"))
+        ppu = make_ppu(ui, mem, numpy)
+        for n in range(40):
+            for i, val in enumerate((16 + n // 5 * 18, 8 + n % 5 * 30, n, (n * 0x30) & 0xF0)):
+                mem[0xFE00 + 4*n + i] = val
+        for addr, val in ((0xFF40, 0xF3), (0xFF42, 0x2D), (0xFF43, 0x13), (0xFF4A, 0x40), (0xFF4B, 87)):
+            mem[addr] = val
+
+        def frame() -> None:
+            for y in range(144):
+                ppu.render_scanline(y)
+            ppu.frame()
+        print(f"{type(ppu).__name__ + ':':10} {best_ns(frame, 1) / 1000:6.1f} us/frame")
+
+
+@benchmark
+def states() -> None:
+    # A whole-machine savestate into a reused buffer, and back
+    cpu = make_cpu()
+    buffer = savestate.save(cpu)
+
+    def save() -> None:
+        for _ in range(100):
+            savestate.save(cpu, buffer)
+
+    def load() -> None:
+        for _ in range(100):
+            savestate.load(cpu, buffer)
+    print(f"{'save:':8} {best_ns(save, 100) / 1000:6.1f} us")
+    print(f"{'load:':8} {best_ns(load, 100) / 1000:6.1f} us")
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -0,0 +1,224 @@
+import glob
+import os
+import random
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cpu import CPU
+from frontend import Headless
+from instruction import instrs
+from mbc import MBC
+from mmu import MMU
+from ppu import PPU, make_ppu
+from recompiler import MAX_INSTRS, Recompiler
+
+# Regression checks: the same ROMs run two ways must come out the same,
+# and checks that need no ROM, which run once.
+#   python check.py                      every check on roms/*.gb
+#   python check.py lazy_flags           one check
+#   python check.py lazy_flags a.gb ...  on other ROMs
+
+Check = Callable[[str], Optional[List[str]]]
+CHECKS: Dict[str, Check] = {}
+STANDALONE: Dict[str, Callable[[], List[str]]] = {}
+FRAMES = 120
+# Recompiled code runs events at the end of a block rather than of an
+# instruction, so up to a block of the longest instructions late
+BLOCK_CYCLES = MAX_INSTRS * 24
+
+Trace = List[Tuple[Any, ...]]
+
+
+def check(fn: Check) -> Check:
+    # fn(rom) returns what went wrong, nothing if all is well, or None
+    # if it can't run here
+    CHECKS[fn.__name__] = fn
+    return fn
+
+
+def standalone(fn: Callable[[], List[str]]) -> Callable[[], List[str]]:
+    STANDALONE[fn.__name__] = fn
+    return fn
+
+
+def make_machine(rom: str, recompile: bool = False, lazy_flags: bool = False,
+                 numpy: bool = False) -> CPU:
+    # As gb.make_machine, which can't be imported without parsing the
+    # command line, and with RAM randomised the same way every time
+    random.seed(0)
+    ui = Headless()
+    crt = MBC(rom)
+    mem = MMU(ui, crt)
+    ppu = make_ppu(ui, mem, numpy)
+    ppu.start_frame()
+    cpu = CPU(mem, ppu, ui, recompile, lazy_flags)
+    crt.load_rom(boot=True)
+    cpu.boot()
+    return cpu
+
+
+def registers(cpu: CPU) -> Trace:
+    # The clock, registers and flags at the end of each frame
+    trace = []
+    for _ in range(FRAMES):
+        cpu.advance_frame(0.0)
+        trace.append((cpu.scheduler.now, *cpu.reg.save_state()))
+    return trace
+
+
+def vblanks(cpu: CPU) -> List[int]:
+    # Filled in with the clock at each VBlank as the machine runs
+    times: List[int] = []
+    cpu.ppu.add_frame_listener(lambda screen: times.append(cpu.scheduler.now))
+    return times
+
+
+def screens(cpu: CPU) -> List[bytes]:
+    # Filled in with each frame as the machine runs
+    frames: List[bytes] = []
+    cpu.ppu.add_frame_listener(lambda screen: frames.append(bytes(screen)))
+    return frames
+
+
+def compare(name: str, a: Trace, b: Trace) -> List[str]:
+    for frame, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return [f"{name}: frame {frame}: {x} != {y}"]
+    return []
+
+
+@check
+def lazy_flags(rom: str) -> List[str]:
+    # Dropping flags nobody reads must not change any register or flag
+    eager = registers(make_machine(rom, recompile=True))
+    lazy = registers(make_machine(rom, recompile=True, lazy_flags=True))
+    return compare("lazy flags", eager, lazy)
+
+
+@check
+def idle_loops(rom: str) -> List[str]:
+    # Skipping idle loops must not change anything but the time taken,
+    # interpreted or recompiled, and must keep recompiled frame timing
+    # with the interpreter's
+    errors = []
+    times = []
+    for recompile in (False, True):
+        engine = "recompiled" if recompile else "interpreted"
+        traces = []
+        for enabled in (False, True):
+            cpu = make_machine(rom, recompile)
+            cpu.idle_loops.enabled = enabled
+            vblank = vblanks(cpu)
+            traces.append(registers(cpu))
+            idle = cpu.idle_loops
+            if idle.skipped_cycles > cpu.scheduler.now:
+                errors.append(f"{engine}: skipped {idle.skipped_cycles} cycles "
+                              f"of {cpu.scheduler.now}")
+        times.append(vblank)
+        errors += compare(f"{engine} skipping", *traces)
+    interpreted, recompiled = times
+    if len(interpreted) != len(recompiled):
+        errors.append(f"{len(interpreted)} VBlanks interpreted, {len(recompiled)} recompiled")
+    for frame, (a, b) in enumerate(zip(interpreted, recompiled)):
+        if abs(a - b) > BLOCK_CYCLES:
+            errors.append(f"VBlank {frame}: at {a} interpreted, {b} recompiled")
+            break
+    return errors
+
+
+@check
+def numpy_ppu(rom: str) -> Optional[List[str]]:
+    # The NumPy PPU must draw every frame exactly as the Python one does
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return None
+    drawn = []
+    for use_numpy in (False, True):
+        cpu = make_machine(rom, numpy=use_numpy)
+        drawn.append(screens(cpu))
+        registers(cpu)
+    expected, actual = drawn
+    if len(expected) != len(actual):
+        return [f"{len(expected)} frames from PPU, {len(actual)} from NumpyPPU"]
+    for frame, (a, b) in enumerate(zip(expected, actual)):
+        if a != b:
+            pixels = sum(x != y for x, y in zip(a, b))
+            return [f"frame {frame}: {pixels} pixels differ"]
+    return []
+
+
+# Branches from 0xC000 to 0xC010 and the cycles they take on hardware
+BRANCHES = (("JR", 0x18, 12), ("JP", 0xC3, 16), ("CALL", 0xCD, 24), ("RET", 0xC9, 16),
+            ("RETI", 0xD9, 16))
+# Conditional ones, as their NZ forms, taken and not taken
+CONDITIONAL = (("JR", 0x20, 12, 8), ("JP", 0xC2, 16, 12), ("CALL", 0xC4, 24, 12),
+               ("RET", 0xC0, 20, 8))
+# Each condition, the flag it tests and the value that takes it
+CONDITIONS = (("NZ", 0x80, False), ("Z", 0x80, True), ("NC", 0x10, False), ("C", 0x10, True))
+
+
+def branch(opcode: int, flags: int, recompile: bool) -> Tuple[int, int]:
+    # Cycles taken by one branch at 0xC000 and where it goes
+    ui = Headless()
+    mem = MMU(ui, MBC("none.gb"))
+    cpu = CPU(mem, PPU(ui, mem), ui)
+    operand = {0: b"", 1: b"\x0E", 2: b"\x10\xC0"}[instrs[opcode].argbytes]
+    mem.mem[0xC000:0xC001 + len(operand)] = bytes((opcode,)) + operand
+    mem.mem[0xCFFE:0xD000] = b"\x10\xC0"  # return address
+    r = cpu.reg
+    r.PC, r.SP, r.F = 0xC000, 0xCFFE, flags
+    start = cpu.scheduler.now
+    if recompile:
+        cycles = Recompiler(cpu).compile(0xC000, 0xC000)(cpu)
+    else:
+        cycles = cpu.step()
+    # Interpreted, a taken conditional branch adds its extra to the clock
+    return cycles + cpu.scheduler.now - start, r.PC
+
+
+@standalone
+def branch_timing() -> List[str]:
+    # Branches must take their hardware cycles, interpreted and recompiled
+    cases = [(name, opcode, 0, True, cycles) for name, opcode, cycles in BRANCHES]
+    for name, opcode, taken, not_taken in CONDITIONAL:
+        for i, (cond, flag, value) in enumerate(CONDITIONS):
+            code = opcode + (i << 3)
+            cases.append((f"{name} {cond} taken", code, flag if value else 0, True, taken))
+            cases.append((f"{name} {cond} not taken", code, 0 if value else flag, False, not_taken))
+    errors = []
+    for label, code, flags, jump, expected in cases:
+        to = 0xC010 if jump else 0xC001 + instrs[code].argbytes
+        for recompile in (False, True):
+            cycles, pc = branch(code, flags, recompile)
+            if (cycles, pc) != (expected, to):
+                engine = "recompiled" if recompile else "interpreted"
+                errors.append(f"{label}, {engine}: {cycles} cycles to 0x{pc:04X}, "
+                              f"expected {expected} to 0x{to:04X}")
+    return errors
+
+
+if __name__ == "__main__":
+    selected = [arg for arg in sys.argv[1:] if arg in CHECKS or arg in STANDALONE]
+    standalones = [name for name in STANDALONE if not selected or name in selected]
+    names = [name for name in CHECKS if not selected or name in selected]
+    roms = [os.path.abspath(arg) for arg in sys.argv[1:] if arg not in selected]
+    roms = roms or sorted(os.path.basename(rom) for rom in glob.glob(os.path.join("roms", "*.gb")))
+    if names and not roms:
+        sys.exit("no ROMs: put some in roms/ or name them")
+    failed = False
+    for name in standalones:
+        errors: Optional[List[str]] = STANDALONE[name]()
+        print(f"{name + ':':12} {'':20} {'FAIL' if errors else 'ok'}")
+        for error in errors or []:
+            print("   ", error)
+        failed = failed or bool(errors)
+    for name in names:
+        for rom in roms:
+            errors = CHECKS[name](rom)
+            result = "skipped" if errors is None else "FAIL" if errors else "ok"
+            print(f"{name + ':':12} {os.path.basename(rom):20} {result}")
+            for error in errors or []:
+                print("   ", error)
+            failed = failed or bool(errors)
+    sys.exit(1 if failed else 0)
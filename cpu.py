@@ -1,59 +1,48 @@
-from interface import Interface
-from typing import Any
+from frontend import Frontend
+from typing import Any, Optional
 
+from idle import IdleLoops
 from instruction import SimpleInstr, instrs, cbinstrs
+from pacing import FRAME_CYCLES, FRAME_RATE
+from recompiler import Recompiler
+from timer import Timer
 import reg
 import mmu
 import ppu
 
+# Host seconds between frames past which RENDER_AUTO counts as behind
+LATE_FRAME = 1.25 / FRAME_RATE
+
 
 class CPU():
 
-    def __init__(self, mem: mmu.MMU, ppu: ppu.PPU, gui: Interface) -> None:
+    def __init__(self, mem: mmu.MMU, ppu: ppu.PPU, gui: Frontend, recompile: bool = False,
+                 lazy_flags: bool = False) -> None:
         self.reg = reg.Reg()
         self.r = self.reg
         self.mem = mem
         self.m = self.mem
+        self.read_pages = mem.read_pages
         self.ppu = ppu
         self.cycles = 0
         self.IF = self.mem.mem[mmu.IF]
         self.ui = gui
 
-        self.DIV = reg.DIV()
-        self.TIMA = reg.TIMA()
-        self.DIV_counter = 0
-        self.TIMA_counter = 0
-        self.TIMA_dividers = [1024, 16, 64, 256]
-        self.TIMA_bits = [9, 3, 5, 7]
+        self.timer = Timer(mem)
+        self.scheduler = mem.scheduler
         self.remaining_cycles = 0
+        self.frame_end = 0
+        self.idle_loops = IdleLoops(self)
 
-        mem.add_io_handler(0xFF04, self.DIV)
-        mem.add_io_handler(0xFF05, self.TIMA)
-
-
-    def clock(self, cycles: int) -> None:
-        self.remaining_cycles -= cycles
-        self.DIV._value += cycles
-
-        #Timer
-        tac = self.m[mmu.TAC]
-        if tac & 0b100 != 0:  # TIMA enabled
-            divider = self.TIMA_dividers[tac & 0b11]
-            cur_div_bit = self.DIV._value & divider
-            if self.TIMA.prev and not cur_div_bit: # Falling edge
-                self.TIMA._value += 1
-            
-            self.TIMA.prev = cur_div_bit
+        # Optional basic-block execution engine
+        self.recompiler: Optional[Recompiler] = Recompiler(self, lazy_flags) if recompile else None
 
-            if self.TIMA._value > 0xFF:
-                self.TIMA._value = self.m[0xFF06]
-                if self.m[mmu.IE] & 0b00100:  # TIMER
-                    self.m[mmu.IF] |= 0b00100
+    def end_frame(self) -> None:
+        self.remaining_cycles = self.frame_end - self.scheduler.now
 
-        # PPU
-        self.ppu.clock(cycles)
-
-        # Interrupt
+    def check_interrupts(self) -> None:
+        # Runs after the scheduler's events, and at every instruction
+        # boundary while something here still has to happen
         if self.r.HALT and self.m.mem[0xFF0F] & self.m.mem[0xFFFF]:
             self.r.HALT = False
 
@@ -75,27 +64,57 @@ class CPU():
                 self.r.IME = False
                 self.m.mem[0xFF0F] &= 0b11011
                 instrs[205].op(self, 0x50)
+            else:
+                return
             # TODO: Serial?
+            # Devices may raise the interrupt again straight away
+            self.scheduler.sync()
         elif self.r.ei:
             if self.r.ei == 2:
                 self.r.IME = True
                 self.r.ei = 0
             else:
                 self.r.ei += 1
+            self.scheduler.sync()
 
+    # Operand fetches go straight to the page table
     def read_byte(self) -> int:
-        self.reg.PC += 1
-        return self.m[self.reg.PC-1]
+        pc = self.reg.PC
+        self.reg.PC = pc + 1
+        return self.read_pages[pc >> 8][pc & 0xFF]
 
     def read_word(self) -> int:
-        l = self.m[self.r.PC]
-        self.r.PC += 1
-        h = self.m[self.r.PC]
-        self.r.PC += 1
-        return (h << 8) + l
+        pc = self.reg.PC
+        self.reg.PC = pc + 2
+        pages = self.read_pages
+        l = pages[pc >> 8][pc & 0xFF]
+        pc += 1
+        return (pages[pc >> 8][pc & 0xFF] << 8) + l
+
+    def step(self) -> int:
+        # One instruction, as run() executes it; returns its cycles. For
+        # code the recompiler won't run from its cache.
+        r = self.reg
+        pc = r.PC
+        i: SimpleInstr = instrs[self.read_pages[pc >> 8][pc & 0xFF]]
+        r.PC = pc + 1
+        arg = 0x00
+        if i.argbytes:
+            if i.argbytes == 1:
+                arg = self.read_byte()
+                if i.value == 0xCB:
+                    i = cbinstrs[arg]
+                    if i.argbytes != 0:
+                        arg = self.read_byte()
+            else:
+                arg = self.read_word()
+        i.op(self, arg)
+        return i.cycles
 
     def advance_frame(self, dt: float) -> None:
-        self.remaining_cycles += 70256
+        # dt: host time since the last call, 0 when not paced
+        self.ppu.behind = dt > LATE_FRAME
+        self.remaining_cycles += FRAME_CYCLES
         self.run()
         self.ui.do_drawing(dt)
 
@@ -148,41 +167,55 @@ class CPU():
         self.m.mem[0xFF00] = 0xFF   # Joypad
 
     def run(self) -> None:
+        s = self.scheduler
+        self.frame_end = s.now + self.remaining_cycles
+        s.schedule(self.end_frame, self.frame_end)
+
+        if self.recompiler is not None:
+            self.recompiler.run()
+            return
 
+        r = self.reg
+        pages = self.read_pages
         arg = 0x00
         #trace = False
         while self.remaining_cycles > 0:
-            if self.reg.HALT:
-                self.clock(4)
-                continue
-
-            #ipc = self.reg.PC
-
-            i:SimpleInstr = instrs[self.mem[self.reg.PC]]
-            #if trace:
-            #    trc = f"{self.reg} (cy: {self.cycles}) ppu:+0 |"
-
-            self.reg.PC += 1
-
-            # TODO: move this into instruction somehow (without overhead)?
-            if i.argbytes:
-                if i.argbytes == 1:
-                    arg = self.read_byte()
-                    if i.value == 0xCB:
-                        i = cbinstrs[arg]
-                        if i.argbytes != 0:
-                            arg = self.read_byte()
-                    #if trace:
-                    #    print(f"{trc}[00]{ipc:04X} {arg:02X} {i} ")
-                else:
-                    arg = self.read_word()
-                #if trace:
-                #    print(f"{trc}[00]{ipc:04X} {arg:04X} {i} ")
-            #elif trace:
-            #    arg = 0x00
-            #    print(f"{trc}[00]{ipc:04X} {i}")
-
-            # TODO: arg, reg, mem?
-            i.op(self, arg)
+            if r.HALT:
+                # Only an event can end HALT, so go straight to it
+                s.skip(4)
+            else:
+                #ipc = r.PC
 
-            self.clock(i.cycles)
+                pc = r.PC
+                i:SimpleInstr = instrs[pages[pc >> 8][pc & 0xFF]]
+                #if trace:
+                #    trc = f"{r} (cy: {s.now}) ppu:+0 |"
+
+                r.PC = pc + 1
+
+                # TODO: move this into instruction somehow (without overhead)?
+                if i.argbytes:
+                    if i.argbytes == 1:
+                        arg = self.read_byte()
+                        if i.value == 0xCB:
+                            i = cbinstrs[arg]
+                            if i.argbytes != 0:
+                                arg = self.read_byte()
+                        #if trace:
+                        #    print(f"{trc}[00]{ipc:04X} {arg:02X} {i} ")
+                    else:
+                        arg = self.read_word()
+                    #if trace:
+                    #    print(f"{trc}[00]{ipc:04X} {arg:04X} {i} ")
+                #elif trace:
+                #    arg = 0x00
+                #    print(f"{trc}[00]{ipc:04X} {i}")
+
+                # TODO: arg, reg, mem?
+                i.op(self, arg)
+                s.now += i.cycles
+
+            # No peripheral work between instructions, only at events
+            if s.now >= s.next:
+                s.run_events()
+                self.check_interrupts()
@@ -0,0 +1,78 @@
+from typing import ByteString, Protocol
+
+
+class Frontend(Protocol):
+    # What the core (MMU, PPU, CPU) needs from whatever presents the screen
+    # and supplies input. Must not require pyglet.
+
+    def update_screen(self, screen: ByteString) -> None:
+        ...
+
+    def do_drawing(self, dt: float) -> None:
+        ...
+
+    @property
+    def input(self) -> int:
+        ...
+
+    @input.setter
+    def input(self, val: int) -> None:
+        ...
+
+
+class Joypad():
+    # Buttons
+    # Bit 7 - Not used
+    # Bit 6 - Not used
+    # Bit 5 - P15 Select Button Keys      (0=Select)
+    # Bit 4 - P14 Select Direction Keys   (0=Select)
+    # Bit 3 - P13 Input Down  or Start    (0=Pressed) (Read Only)
+    # Bit 2 - P12 Input Up    or Select   (0=Pressed) (Read Only)
+    # Bit 1 - P11 Input Left  or Button B (0=Pressed) (Read Only)
+    # Bit 0 - P10 Input Right or Button A (0=Pressed) (Read Only)
+
+    def __init__(self) -> None:
+        self._direction = 0xF
+        self._button = 0xF
+        self.direction_enable = False
+        self.button_enable = False
+
+    @property
+    def input(self) -> int:
+        buttons = 0x00
+        if self.direction_enable:
+            buttons |= self._direction
+
+        if self.button_enable:
+            buttons |= self._button
+
+        buttons |= (not self.direction_enable) << 4
+        buttons |= (not self.button_enable) << 5
+
+        return buttons
+
+    @input.setter
+    def input(self, val: int) -> None:
+        self.direction_enable = val & (1 << 4) == 0
+        self.button_enable = val & (1 << 5) == 0
+
+
+class Headless(Joypad):
+    # Front end for running without a display (batch jobs, CI).
+    # Keeps the last frame around so callers can inspect it.
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.frame_ready = False
+        self.frames = 0
+        self.screen: ByteString = bytes(160*144)
+
+    def update_screen(self, screen: ByteString) -> None:
+        self.screen = screen
+        self.frame_ready = True
+
+    def do_drawing(self, dt: float) -> None:
+        if not self.frame_ready:
+            return
+        self.frames += 1
+        self.frame_ready = False
@@ -1,12 +1,13 @@
+import argparse
+import threading
 import time
 
-import pyglet  # TODO: reclass exceptions
-
 from mbc import MBC
 from cpu import CPU
-from interface import Interface
+from frontend import Frontend, Headless
 from mmu import MMU
-from ppu import PPU
+from pacing import FRAME_RATE, Pacer
+from ppu import RENDER_LEVELS, make_ppu
 
 print("name", __name__)
 
@@ -15,7 +16,54 @@ def nop(dt: float) -> None:
     pass
 
 
-def gb() -> None:
+def emulate(pacer: Pacer, stop: threading.Event) -> None:
+    # The emulation loop for --threaded
+    while not stop.is_set():
+        delay = pacer.tick()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def make_machine(rom: str, ui: Frontend, recompile: bool = False,
+                 lazy_flags: bool = False, numpy: bool = False,
+                 render: str = "full", frame_skip: int = 2) -> CPU:
+    crt = MBC(rom)
+    mem = MMU(ui, crt)
+    ppu = make_ppu(ui, mem, numpy)
+    ppu.render_level = RENDER_LEVELS[render]
+    ppu.frame_skip = frame_skip
+    ppu.start_frame()
+    cpu = CPU(mem, ppu, ui, recompile, lazy_flags)
+
+    crt.load_rom(boot=True)
+    cpu.boot()
+    return cpu
+
+
+def headless(rom: str, frames: int, recompile: bool, lazy_flags: bool, numpy: bool,
+             render: str, frame_skip: int, speed: float) -> None:
+    # No window, no pyglet: by default run as fast as the core allows
+    ui = Headless()
+    cpu = make_machine(rom, ui, recompile, lazy_flags, numpy, render, frame_skip)
+    pacer = Pacer(cpu.advance_frame, speed)
+    start = time.perf_counter()
+    while pacer.frames < frames:
+        delay = pacer.tick()
+        if delay > 0:
+            time.sleep(delay)
+    elapsed = time.perf_counter() - start
+    print(f"{pacer.frames} frames in {elapsed:.2f}s ({pacer.frames / elapsed:.2f} fps, "
+          f"{pacer.frames / elapsed / FRAME_RATE:.2f}x, {pacer.dropped} dropped)")
+    idle = cpu.idle_loops
+    print(f"idle loops: {idle.skips} skips, {idle.skipped_cycles} cycles "
+          f"({idle.skipped_cycles / max(cpu.scheduler.now, 1):.1%} of the run)")
+
+
+def gb(rom: str, recompile: bool, lazy_flags: bool, numpy: bool, render: str,
+       frame_skip: int, threaded: bool, speed: float) -> None:
+    import pyglet  # TODO: reclass exceptions
+    from interface import Interface
+
     for _ in range(50):
         try:
             interface = Interface(320, 288, vsync=False)
@@ -27,22 +75,34 @@ def gb() -> None:
         raise Exception("Failed to create window")
     print("Window OK")
 
-    crt = MBC("poke.gb")
-    mem = MMU(interface, crt)
-    ppu = PPU(interface, mem)
-    cpu = CPU(mem, ppu, interface)
+    cpu = make_machine(rom, interface, recompile, lazy_flags, numpy, render, frame_skip)
+    interface.set_caption("AshnasGB - " + cpu.mem.mbc.get_rom_name())
 
-    crt.load_rom(boot=True)
-    cpu.boot()
-    interface.set_caption("AshnasGB - " + crt.get_rom_name())
+    pacer = Pacer(cpu.advance_frame, speed)
+
+    def step(dt: float) -> None:
+        pyglet.clock.schedule_once(step, max(pacer.tick(), 0.0))
+
+    def report(dt: float) -> None:
+        interface.speed = pacer.measure()
+        interface.update_fps(dt)
 
-    pyglet.clock.schedule_interval(cpu.advance_frame, 1/59.7)
-    pyglet.clock.schedule_interval(interface.update_fps, 1.0)
+    stop = threading.Event()
+    emulation = threading.Thread(target=emulate, args=(pacer, stop), daemon=True)
+    if threaded:
+        interface.present_from(cpu.ppu.screens, 1/60)
+        emulation.start()
+    else:
+        step(0.0)
+    pyglet.clock.schedule_interval(report, 1.0)
     # import cProfile, pstats, io
     # from pstats import SortKey
     # pr = cProfile.Profile()
     # pr.enable()
     pyglet.app.run()
+    if threaded:
+        stop.set()
+        emulation.join()
     # pr.disable()
     # s = io.StringIO()
     # sortby = SortKey.CUMULATIVE
@@ -51,4 +111,40 @@ def gb() -> None:
     # print(s.getvalue())
 
 
-gb()
+def frame_count(value: str) -> int:
+    frames = int(value)
+    if frames < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {frames}")
+    return frames
+
+
+parser = argparse.ArgumentParser(description="AshnasGB")
+parser.add_argument("rom", nargs="?", default="poke.gb")
+parser.add_argument("--headless", action="store_true",
+                    help="run without a window (no pyglet required)")
+parser.add_argument("--frames", type=int, default=600,
+                    help="frames to run in headless mode")
+parser.add_argument("--recompile", action="store_true",
+                    help="execute through the basic-block recompiler")
+parser.add_argument("--lazy-flags", action="store_true",
+                    help="with --recompile, skip flag results that are never read")
+parser.add_argument("--numpy", action="store_true",
+                    help="render with the NumPy PPU (falls back without NumPy)")
+parser.add_argument("--render", choices=RENDER_LEVELS, default="full",
+                    help="frames to draw: all, one in --frame-skip, those the host "
+                         "has time for, or none")
+parser.add_argument("--frame-skip", type=frame_count, default=2,
+                    help="with --render skip, draw one frame in this many")
+parser.add_argument("--threaded", action="store_true",
+                    help="emulate on a thread of its own, presenting from the main one")
+parser.add_argument("--speed", type=float,
+                    help="run at this multiple of a Game Boy's speed, 0 for as fast as "
+                         "possible (default: 1, or 0 with --headless)")
+args = parser.parse_args()
+
+if args.headless:
+    headless(args.rom, args.frames, args.recompile, args.lazy_flags, args.numpy,
+             args.render, args.frame_skip, 0.0 if args.speed is None else args.speed)
+else:
+    gb(args.rom, args.recompile, args.lazy_flags, args.numpy, args.render, args.frame_skip,
+       args.threaded, 1.0 if args.speed is None else args.speed)
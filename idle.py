@@ -0,0 +1,110 @@
+from __future__ import annotations
+import ast
+from typing import Callable, Dict, List, Optional, Set
+
+from instruction import decode
+from opcodes import REGISTERS, JUMPS
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from cpu import CPU
+    from reg import Reg
+
+MAX_INSTRS = 8
+# Reads of these change with the clock rather than at events
+CLOCKED = {0xFF04, 0xFF05}  # DIV, TIMA
+
+
+class IdleLoop():
+    def __init__(self, cycles: int, branch_cycles: int, addresses: Callable[[Reg], List[int]]) -> None:
+        self.cycles = cycles
+        self.branch_cycles = branch_cycles
+        self.addresses = addresses
+
+
+class IdleLoops():
+    # Busy-wait loops like LDH A,(44); CP n; JR NZ. A short backward loop
+    # that writes nothing and carries no register from one pass to the
+    # next does exactly the same thing every pass until memory changes,
+    # and memory only changes at scheduler events. Passes that finish
+    # before the next event are skipped rather than executed.
+
+    def __init__(self, cpu: CPU) -> None:
+        self.cpu = cpu
+        self.mem = cpu.mem
+        self.mbc = cpu.mem.mbc
+        self.scheduler = cpu.scheduler
+        self.enabled = True
+        self.loops: Dict[int, Optional[IdleLoop]] = {}
+        self.skips = 0
+        self.skipped_cycles = 0
+
+    def jumped_back(self, start: int, end: int) -> None:
+        # From the JR/JP handlers, before the jump's cycles are counted.
+        # During OAM DMA the loop's code reads as 0xFF: nothing is decoded
+        # or cached until the bus is back.
+        if end > 0x8000 or start >> 14 != (end - 1) >> 14 or self.mem.dma_active:
+            return
+        if start < 0x4000:
+            bank = 0x200 if self.mbc.bootrom_mapped else self.mbc.rom_bank0
+        else:
+            bank = self.mbc.rom_bank1
+        key = (bank << 32) | (start << 16) | end
+        if key not in self.loops:
+            self.loops[key] = self.find(start, end)
+        loop = self.loops[key]
+        if loop is not None:
+            self.skip(loop, loop.branch_cycles)
+
+    def find(self, start: int, end: int) -> Optional[IdleLoop]:
+        # The loop from start up to the jump ending at end, if it is idle
+        if self.mem.dma_active:
+            return None
+        live: Set[str] = set()
+        defined: Set[str] = set()
+        writes: Set[str] = set()
+        reads: List[str] = []
+        cycles = 0
+        pc = start
+        for _ in range(MAX_INSTRS):
+            i, op, arg, length = decode(self.mem, pc)
+            pc += length
+            if op.stores or op.syncs or (op.exits and pc != end):
+                return None
+            live |= op.live_in - defined
+            defined |= op.defined
+            writes |= op.writes
+            reads += [f"n = {arg}\na.append({expr})" for expr in op.addresses]
+            cycles += i.cycles
+            if pc == end:
+                break
+        else:
+            return None
+        if self.mem[pc - length] not in JUMPS or live & writes & set(REGISTERS):
+            return None
+        cycles += op.taken  # the jump back is always taken
+
+        # Addresses may only use the operand and registers the loop keeps
+        names = {node.id for src in reads for node in ast.walk(ast.parse(src))
+                 if isinstance(node, ast.Name)}
+        if names - {"n", "a", *REGISTERS} or names & writes:
+            return None
+        src = ("def addresses(r):\n    a = []\n"
+               + "".join(f"    {n} = r.{n}\n" for n in REGISTERS if n in names)
+               + "".join(f"    {line}\n" for src in reads for line in src.split("\n"))
+               + "    return a\n")
+        namespace: Dict[str, Callable[[Reg], List[int]]] = {}
+        exec(compile(src, f"<idle {start:04X}>", "exec"), namespace)
+        return IdleLoop(cycles, i.cycles, namespace["addresses"])
+
+    def skip(self, loop: IdleLoop, pending: int) -> None:
+        # pending: cycles of this pass not yet on the clock. The pass must
+        # have started after the last events, or it read stale memory.
+        s = self.scheduler
+        end = s.now + pending
+        passes = (s.next - end - 1) // loop.cycles
+        if (passes > 0 and self.enabled and end - loop.cycles >= s.last
+                and not CLOCKED.intersection(loop.addresses(self.cpu.reg))):
+            s.now += passes * loop.cycles
+            self.skips += 1
+            self.skipped_cycles += passes * loop.cycles
@@ -1,27 +1,46 @@
-from typing import Any, ByteString
+import time
+from typing import Any, ByteString, Dict, Optional
 
 import pyglet
 pyglet.options['shadow_window'] = False
-from pyglet.gl import GL_NEAREST
+from pyglet.gl import (GL_NEAREST, GL_ONE, GL_R8, GL_RED, GL_TEXTURE_2D, GL_TEXTURE_SWIZZLE_RGBA,
+                       GL_UNSIGNED_BYTE, GLint, GLubyte, glBindTexture, glTexParameteriv,
+                       glTexSubImage2D)
 from pyglet.math import Mat4
 
+from frontend import Joypad
+from ppu import Screens
 
 
-class Interface(pyglet.window.Window):
+class Interface(pyglet.window.Window, Joypad):
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
+        Joypad.__init__(self)
         self.frame_ready = False
         self.frames = 0
-        self._direction = 0xF
-        self._button = 0xF
-        self.direction_enable = False
-        self.button_enable = False
-        pyglet.image.Texture.default_mag_filter = GL_NEAREST
         self.projection = Mat4.orthogonal_projection(
             0, 320, 0, 288, -255, 255
         )
         self.fps = 0.0
+        self.speed = 0.0  # emulation speed, 1.0 being a Game Boy's
+        self.present_time = 0.0  # seconds spent uploading and drawing since update_fps
+
+        # One greyscale texture for the whole run, updated in place from the
+        # PPU's buffer and drawn as a single sprite
+        self.texture = pyglet.image.Texture.create(160, 144, internalformat=GL_R8, fmt=GL_RED,
+                                                   min_filter=GL_NEAREST, mag_filter=GL_NEAREST)
+        glBindTexture(GL_TEXTURE_2D, self.texture.id)
+        swizzle = (GLint * 4)(GL_RED, GL_RED, GL_RED, GL_ONE)
+        glTexParameteriv(GL_TEXTURE_2D, GL_TEXTURE_SWIZZLE_RGBA, swizzle)
+        self.batch = pyglet.graphics.Batch()
+        self.sprite = pyglet.sprite.Sprite(self.texture, batch=self.batch)
+        # ctypes views of the PPU's buffers, by id
+        self._pixels: Dict[int, Any] = {}
+        # Set by present_from: frames are then shown from the main thread,
+        # whatever thread the emulation runs on
+        self.screens: Optional[Screens] = None
+        self._shown = 0
 
         self._game_caption = ""
         self.view = self.view.scale((2, 2, 1))
@@ -30,14 +49,46 @@ class Interface(pyglet.window.Window):
         self.set_icon(icon)
 
     def update_screen(self, screen: ByteString) -> None:
-        self.buf = pyglet.image.ImageData(160, 144, 'L', screen)
+        if self.screens is not None:
+            return  # present picks it up
+        # Uploaded now, at VBlank, before the PPU starts on the next frame
+        start = time.perf_counter()
+        self.upload(screen)
+        self.present_time += time.perf_counter() - start
         self.frame_ready = True
 
+    def upload(self, screen: ByteString) -> None:
+        pixels = self._pixels.get(id(screen))
+        if pixels is None:
+            pixels = self._pixels[id(screen)] = (GLubyte * len(screen)).from_buffer(screen)
+        glBindTexture(GL_TEXTURE_2D, self.texture.id)
+        glTexSubImage2D(GL_TEXTURE_2D, 0, 0, 0, 160, 144, GL_RED, GL_UNSIGNED_BYTE, pixels)
+
+    def present_from(self, screens: Screens, interval: float) -> None:
+        # For an emulation loop on another thread: GL stays on this one
+        self.screens = screens
+        pyglet.clock.schedule_interval(self.present, interval)
+
+    def present(self, dt: float) -> None:
+        screens = self.screens
+        if screens is None or screens.frames == self._shown:
+            return
+        start = time.perf_counter()
+        with screens.lock:
+            self._shown = screens.frames
+            self.upload(screens.front)
+        self.batch.draw()
+        self.present_time += time.perf_counter() - start
+        self.frames += 1
+
     def update_fps(self, dt: float) -> None:
         self.fps = self.frames / dt
+        present = self.present_time / max(self.frames, 1) * 1000
         self.frames = 0
+        self.present_time = 0.0
         if self._game_caption:
-            self.set_caption(f"{self.fps:.2f} {self._game_caption} ")
+            self.set_caption(f"{self.fps:.2f} {self.speed:.2f}x {present:.2f}ms "
+                             f"{self._game_caption} ")
         else:
             self._game_caption = self.caption
 
@@ -45,9 +96,11 @@ class Interface(pyglet.window.Window):
         pass
 
     def do_drawing(self, dt: float) -> None:
-        if not self.frame_ready:
+        if self.screens is not None or not self.frame_ready:
             return
-        self.buf.blit(0, 0)
+        start = time.perf_counter()
+        self.batch.draw()
+        self.present_time += time.perf_counter() - start
 
         self.frames += 1
         self.frame_ready = False
@@ -56,16 +109,6 @@ class Interface(pyglet.window.Window):
     def on_close(self) -> None:
         pyglet.app.exit()
 
-    # Buttons
-    # Bit 7 - Not used
-    # Bit 6 - Not used
-    # Bit 5 - P15 Select Button Keys      (0=Select)
-    # Bit 4 - P14 Select Direction Keys   (0=Select)
-    # Bit 3 - P13 Input Down  or Start    (0=Pressed) (Read Only)
-    # Bit 2 - P12 Input Up    or Select   (0=Pressed) (Read Only)
-    # Bit 1 - P11 Input Left  or Button B (0=Pressed) (Read Only)
-    # Bit 0 - P10 Input Right or Button A (0=Pressed) (Read Only)
-
     def on_key_press(self, symbol: int, _: int) -> None:
         if symbol == 65363:  # RIGHT
             self._direction &= ~0x1
@@ -105,22 +148,3 @@ class Interface(pyglet.window.Window):
             self._button |= 0x8
         elif symbol == 65307:  # ESC
             pyglet.app.exit()
-
-    @property
-    def input(self) -> int:
-        buttons = 0x00
-        if self.direction_enable:
-            buttons |= self._direction
-
-        if self.button_enable:
-            buttons |= self._button
-
-        buttons |= (not self.direction_enable) << 4
-        buttons |= (not self.button_enable) << 5
-
-        return buttons
-
-    @input.setter
-    def input(self, val: int) -> None:
-        self.direction_enable = val & (1 << 4) == 0
-        self.button_enable = val & (1 << 5) == 0
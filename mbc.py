@@ -1,6 +1,19 @@
 from enum import Enum
+import mmap
 import os
-from typing import Union
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+# ROM files mapped so far, shared by every MBC in the process. The mapping
+# is read-only, so processes running the same ROM share its page cache too.
+_mapped_roms: Dict[str, memoryview] = {}
+
+
+def open_rom(path: str) -> memoryview:
+    path = os.path.abspath(path)
+    if path not in _mapped_roms:
+        with open(path, "rb") as f:
+            _mapped_roms[path] = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return _mapped_roms[path]
 
 
 # Flags
@@ -42,10 +55,47 @@ class MBC():
         self.mode = MBC_MODE.ROM
         self.ram_enabled = False
         self.upper_bank = 0
+        self.ram_bank = 0
         self.file = file
         self.rom_name: Union[str, None] = None
-        self.bank0: memoryview = memoryview(bytearray(0x4000))
-        self.bank1: memoryview = memoryview(bytearray(0x4000))
+        # Banks as 256-byte pages for the MMU's page table, made when
+        # a bank is first mapped
+        self._pages: Dict[int, List[memoryview]] = {}
+        self.bootrom: Union[memoryview, None] = None
+        # Which ROM banks are currently mapped at 0x0000 and 0x4000
+        self.rom_bank0 = 0
+        self.rom_bank1 = 1
+        self.bootrom_mapped = False
+        self._bank_listeners: List[Callable[[], None]] = []
+
+    def add_bank_listener(self, listener: Callable[[], None]) -> None:
+        # Called after anything remaps the ROM windows. Switching banks
+        # only changes rom_bank0/rom_bank1: the MMU listens and points its
+        # pages at the new banks, nothing is copied.
+        self._bank_listeners.append(listener)
+
+    def save_state(self) -> Tuple[Any, ...]:
+        return (self.mode.value, self.ram_enabled, self.upper_bank, self.ram_bank,
+                self.rom_bank0, self.rom_bank1, self.bootrom_mapped)
+
+    def load_state(self, state: Tuple[Any, ...]) -> None:
+        mode, self.ram_enabled, self.upper_bank, self.ram_bank, \
+            self.rom_bank0, self.rom_bank1, self.bootrom_mapped = state
+        self.mode = MBC_MODE(mode)
+        if self._rom:  # else load_rom maps them
+            for listener in self._bank_listeners:
+                listener()
+
+    def _switch(self, bank0: int, bank1: int) -> None:
+        banks = self.rom_size // 16384
+        bank0 %= banks
+        bank1 %= banks
+        if bank0 == self.rom_bank0 and bank1 == self.rom_bank1:
+            return
+        self.rom_bank0 = bank0
+        self.rom_bank1 = bank1
+        for listener in self._bank_listeners:
+            listener()
 
     def get_mbc(self, bank: memoryview) -> MBC_TYPE:
         return MBC_TYPE(bank[0x147])
@@ -66,45 +116,52 @@ class MBC():
         return banks[size]
 
     def load_rom(self, boot: bool = False) -> None:
-        self._rom = []  # clear rom
         path = os.path.join("roms", self.file)
-        with open(path, "r+b") as f:
-            # Read first two banks
-            self.rom_name = self.file
-            if self.rom_size == 0:
-                bank = memoryview(bytearray(0x4000))
-                f.readinto(bank)  # type: ignore # https://github.com/python/typing/issues/659#issuecomment-638384893
-                self.rom_size = self.get_rom_size(bank)
-                self.type = self.get_mbc(bank)
-                self._rom.append(bank)
-
-            while True:
-                # Read remainder of ROM
-                bank = memoryview(bytearray(0x4000))
-                if f.readinto(bank) == 0:  # type: ignore # https://github.com/python/typing/issues/659#issuecomment-638384893
-                    break
-                self._rom.append(bank)
+        rom = open_rom(path)
+        # Banks are views of the mapping, only a short last bank is copied
+        self._rom = [rom[start:start + 0x4000] for start in range(0, len(rom), 0x4000)]
+        if len(self._rom[-1]) < 0x4000:
+            bank = memoryview(bytearray(0x4000))
+            bank[:len(self._rom[-1])] = self._rom[-1]
+            self._rom[-1] = bank
+        self._pages = {}
+        self.rom_name = self.file
+        self.rom_size = self.get_rom_size(self._rom[0])
+        self.type = self.get_mbc(self._rom[0])
 
         bootrom = os.path.join("roms", "boot.bin")
+        self.bootrom_mapped = False
         if boot and os.path.isfile(bootrom):
-            with open(bootrom, "r+b") as f:
+            with open(bootrom, "rb") as f:
                 print("Running boot rom")
                 bank = memoryview(bytearray(0x100))
                 f.readinto(bank)  # type: ignore # https://github.com/python/typing/issues/659#issuecomment-638384893
-                self._rom[0][0:0x100] = bank[:]
+                # Overlays the first page of bank 0 until disabled
+                self.bootrom = bank
+                self.bootrom_mapped = True
         else:
             print("Loading", os.path.abspath(path))
 
-        self.bank0[:] = self._rom[0]
-        if len(self._rom) > 1:
-            self.bank1[:] = self._rom[1]
+        self.rom_bank0 = 0
+        self.rom_bank1 = 1 % len(self._rom)
+        for listener in self._bank_listeners:
+            listener()
+
+    def bank_pages(self, bank: int) -> List[memoryview]:
+        pages = self._pages.get(bank)
+        if pages is None:
+            rom = self._rom[bank]
+            pages = self._pages[bank] = [rom[p << 8:(p + 1) << 8] for p in range(0x40)]
+        return pages
 
     def get_rom_name(self) -> str:
         return self._rom[0][0x0134:0x0143].tobytes().decode()
 
     def disable_bootrom(self, val: int) -> None:
-        if val == 0x01:
-            self.load_rom()
+        if val == 0x01 and self.bootrom_mapped:
+            self.bootrom_mapped = False
+            for listener in self._bank_listeners:
+                listener()
 
     def __setitem__(self, key: int, val: int) -> None:
         if self.type == MBC_TYPE.NONE:
@@ -119,7 +176,7 @@ class MBC():
                 if bank == 0:
                     bank = 1
                 bank += self.upper_bank
-                self.bank1[:] = self._rom[bank % (self.rom_size // 16384)]
+                self._switch(self.rom_bank0, bank)
             elif key < 0x6000:  # RAM Bank Number / Upper Bits of ROM Bank no 0x4000 - 0x5FFF
                 if self.mode == MBC_MODE.ROM:
                     self.upper_bank = (val & 0x03) << 5
@@ -129,10 +186,10 @@ class MBC():
                 mode = val & 0x01
                 if mode:
                     self.mode = MBC_MODE.RAM
-                    self.bank0[:] = self._rom[self.upper_bank % (self.rom_size // 16384)]
+                    self._switch(self.upper_bank, self.rom_bank1)
                 else:
                     self.mode = MBC_MODE.ROM
-                    self.bank0[:] = self._rom[0]
+                    self._switch(0, self.rom_bank1)
 
         elif self.type == MBC_TYPE.MBC2:
             if key < 0x4000:  # RAM Enable and Bank switching
@@ -141,7 +198,7 @@ class MBC():
                     bank = val & 0x0F
                     if bank == 0:
                         bank = 1
-                    self.bank1[:] = self._rom[bank % (self.rom_size // 16384)]
+                    self._switch(self.rom_bank0, bank)
                 else:
                     self.ram_enabled = val & 0x0A == 0x0A
         elif self.type == MBC_TYPE.MBC3:
@@ -152,6 +209,6 @@ class MBC():
 
                 if bank == 0:
                     bank = 1
-                self.bank1[:] = self._rom[bank % (self.rom_size // 16384)]
+                self._switch(self.rom_bank0, bank)
             elif key < 0x6000:  # RAM Bank Number / Upper Bits of ROM Bank no 0x4000 - 0x5FFF
                 self.ram_bank = (val & 0x03)
@@ -1,10 +1,11 @@
 from mbc import MBC
 import random
 import sys
-from typing import Dict
+from typing import ByteString, Callable, List, Optional, Tuple, Union, cast
 
-from interface import Interface
-from reg import Register, HandlerProxy
+from frontend import Frontend
+from reg import Register
+from scheduler import Scheduler
 
 # I/O Registers
 IE  = 0xFFFF
@@ -15,6 +16,104 @@ TAC = 0xFF07
 IF  = 0xFF0F
 LY  = 0xFF44
 
+# Writes that change what the timer, PPU or interrupt logic will do next
+SYNC_IO = {DIV, TIMA, TMA, TAC, IF, 0xFF40, 0xFF41, 0xFF45}
+
+# OAM DMA is 160 M-cycles, as long as the usual HRAM wait that covers it
+# (40 x DEC A; JR NZ)
+DMA_CYCLES = 160 * 4
+
+# Dirty bitmaps with every tile (0x8000-0x97FF) or map row (0x9800-0x9FFF) set
+ALL_TILES = (1 << 384) - 1
+ALL_ROWS = (1 << 64) - 1
+
+
+class Page():
+    # A 256-byte page that needs more than a memoryview, indexed by the low
+    # byte of the address like the memoryview pages. Reads come from the
+    # backing store and writes are dropped unless a subclass says otherwise.
+    def __init__(self, mmu:"MMU", base:int) -> None:
+        self.mmu = mmu
+        self.base = base
+
+    def __getitem__(self, offset:int) -> int:
+        return self.mmu.mem[self.base | offset]
+
+    def __setitem__(self, offset:int, val:int) -> None:
+        pass
+
+
+class ROMPage(Page):
+    def __setitem__(self, offset:int, val:int) -> None:
+        self.mmu.mbc[self.base | offset] = val
+
+
+class VRAMPage(Page):
+    # Only writes that change a byte mark it dirty: its 16-byte tile below
+    # 0x9800, its 32-byte row of a tile map above
+    def __setitem__(self, offset:int, val:int) -> None:
+        mmu = self.mmu
+        addr = self.base | offset
+        if mmu.mem[addr] != val:
+            mmu.mem[addr] = val
+            if addr < 0x9800:
+                mmu.dirty_tiles |= 1 << ((addr - 0x8000) >> 4)
+            else:
+                mmu.dirty_rows |= 1 << ((addr - 0x9800) >> 5)
+
+
+class ERAMPage(Page):
+    def __setitem__(self, offset:int, val:int) -> None:
+        if self.mmu.mbc.ram_enabled:
+            # TODO: Read $0x149 and determine RAM Size
+            # TODO: Pass to MBC
+            self.mmu.mem[self.base | offset] = val
+
+
+class EchoPage(Page):
+    # Echo RAM, subtract 0x2000
+    def __setitem__(self, offset:int, val:int) -> None:
+        key = (self.base - 0x2000) | offset
+        self.mmu.mem[key] = val
+        if self.mmu.code_map[key]:
+            self.mmu.code_write(key)
+
+
+class OAMPage(Page):
+    def __getitem__(self, offset:int) -> int:
+        if offset < 0x80:
+            return self.mmu.OAM[offset]
+        return 0xFF
+
+    def __setitem__(self, offset:int, val:int) -> None:
+        if offset < 0xA0:
+            self.mmu.OAM[offset] = val
+            self.mmu.oam_written = True
+
+
+class IOPage(Page):
+    # The registers, HRAM and IE
+    def __getitem__(self, offset:int) -> int:
+        mmu = self.mmu
+        if offset >= 0x80:
+            return mmu.mem[0xFF00 | offset]
+        read = mmu.io_reads[offset]
+        if read is None:
+            return mmu.IO[offset]
+        return read()
+
+    def __setitem__(self, offset:int, val:int) -> None:
+        mmu = self.mmu
+        if offset >= 0x80:
+            mmu.mem[0xFF00 | offset] = val
+            if offset == 0xFF:
+                mmu.scheduler.sync()
+            return
+        write = mmu.io_writes[offset]
+        if write is None:
+            mmu.IO[offset] = val
+        else:
+            write(val)
 
 
 class MMU():
@@ -36,13 +135,11 @@ class MMU():
     #FF80	FFFE	High RAM (HRAM)	
     #FFFF	FFFF	Interrupts Enable Register (IE)
 
-    def __init__(self, interface:Interface, mbc:MBC) -> None:
+    def __init__(self, interface:Frontend, mbc:MBC) -> None:
         self._ui = interface
 
         self.mem = bytearray(random.getrandbits(8) for _ in range(65536))  # type: ignore # Randomise RAM
         view = memoryview(self.mem)
-        self._rom0  = view[0:0x4000]
-        self._rom1  = view[0x4000:0x8000]
         self._vram  = view[0x8000:0xA000]
         self._eram  = view[0xA000:0xC000]
         self._wram  = view[0xC000:0xE000]
@@ -53,8 +150,7 @@ class MMU():
 
         self.view = view
         self.mbc = mbc
-        self.mbc.bank0 = self._rom0
-        self.mbc.bank1 = self._rom1
+        self.scheduler = Scheduler()
 
         self.view[0xFE00:0xFFFF]      = bytearray([0x00 for _ in range(0x1FF)])  # IO, etc defaults to blank
         self.mem[0xFFFF] = 0xFF  # IE
@@ -62,84 +158,201 @@ class MMU():
         self.link_buffer = 0
 
         self.serial_buff = ""
-        self._io_handlers:Dict[int, Register] = {}
-        self.add_io_handler(0xFF46, HandlerProxy(self.dma))
+        # Bit n: tile n (0x8000 + 16n) or tile-map row n (0x9800 + 32n)
+        # was written since the last take_dirty_tiles/take_dirty_rows
+        self.dirty_tiles = ALL_TILES
+        self.dirty_rows = ALL_ROWS
+        self.oam_written = True  # by the CPU or DMA, until the PPU clears it
+        # Set for every RAM byte that is part of recompiled code,
+        # code_write is then told about writes to it
+        self.code_map = bytearray(0x10000)
+        self.code_write:Callable[[int], None] = lambda addr: None
+        # One slot per register from 0xFF00. None reads and writes MMU.IO.
+        self.io_reads:List[Optional[Callable[[], int]]] = [None] * 0x80
+        self.io_writes:List[Optional[Callable[[int], None]]] = [None] * 0x80
+        for addr in SYNC_IO:
+            self.add_io(addr)
+        # Joypad and serial don't keep their value in IO
+        self.io_reads[0x00] = self.read_joypad
+        self.io_writes[0x00] = self.write_joypad
+        self.io_writes[0x01] = self.write_serial_data
+        self.io_writes[0x02] = self.write_serial_control
+        self.io_writes[0x46] = self.dma
         # Add bootrom disable handler
-        self.add_io_handler(0xFF50, HandlerProxy(self.mbc.disable_bootrom))
+        self.add_io(0xFF50, write=self.mbc.disable_bootrom)
+
+        # Indexed by the high byte of the address: plain memory is a
+        # memoryview of its page, everything else a Page
+        pages = [view[p << 8:(p + 1) << 8] for p in range(0x100)]
+        self.read_pages:List[Union[memoryview, Page]] = [*pages[:0xE0], *pages[0xC0:0xDE]]
+        self.write_pages:List[Union[memoryview, Page]] = [*pages[:0xFE]]
+        for p in range(0x00, 0x80):
+            self.write_pages[p] = ROMPage(self, p << 8)
+        for p in range(0x80, 0xA0):
+            self.write_pages[p] = VRAMPage(self, p << 8)
+        for p in range(0xA0, 0xC0):
+            self.write_pages[p] = ERAMPage(self, p << 8)
+        for p in range(0xE0, 0xFE):
+            self.write_pages[p] = EchoPage(self, p << 8)
+        for page in (OAMPage(self, 0xFE00), IOPage(self, 0xFF00)):
+            self.read_pages.append(page)
+            self.write_pages.append(page)
+        # Until a ROM is loaded the ROM windows read mem like everything else
+        self._rom0 = (-1, False)
+        self.mbc.add_bank_listener(self.map_rom)
+
+        # While OAM DMA runs the CPU only reaches the 0xFF page: the other
+        # pages are swapped for these and the real ones kept here
+        self._dma_pages:Optional[Tuple[List[Union[memoryview, Page]], List[Union[memoryview, Page]]]] = None
+        self._bus_read:List[Union[memoryview, Page]] = [memoryview(bytes([0xFF] * 0x100))] * 0xFF
+        self._bus_write:List[Union[memoryview, Page]] = [Page(self, 0)] * 0xFF
+        # Whether _dma_pages is set; a plain attribute for the run loops
+        self.dma_active = False
+
+    def map_rom(self) -> None:
+        # Point the ROM windows at the banks the MBC has selected. Usually
+        # only 0x4000-0x7FFF has changed.
+        mbc = self.mbc
+        pages = self.read_pages if self._dma_pages is None else self._dma_pages[0]
+        pages[0x40:0x80] = mbc.bank_pages(mbc.rom_bank1)
+        rom0 = (mbc.rom_bank0, mbc.bootrom_mapped)
+        if rom0 != self._rom0:
+            self._rom0 = rom0
+            pages[0x00:0x40] = mbc.bank_pages(mbc.rom_bank0)
+            if mbc.bootrom_mapped and mbc.bootrom is not None:
+                pages[0x00] = mbc.bootrom
+
+    def read_joypad(self) -> int:
+        return self._ui.input
+
+    def write_joypad(self, val:int) -> None:
+        self._ui.input = val
+
+    def write_serial_data(self, val:int) -> None:
+        self.link_buffer = val
+
+    def write_serial_control(self, val:int) -> None:
+        if val == 0x81:
+            self.serial_buff += chr(self.link_buffer)
+            if self.link_buffer == ord("\n"):
+                print(self.serial_buff, end='', file=sys.stderr)
+                # Test ROM Routines
+                if self.serial_buff == "Passed\n":
+                    #sys.exit(0)
+                    pass
+                elif self.serial_buff ==  "Failed\n":
+                    #sys.exit(1)
+                    pass
+                self.serial_buff = ""
 
     def dma(self, val:int) -> None:
-        dest = 0xFE00
-        offset = val * 0x100
-        for n in range(0xA0):
-            self.mem[dest + n] = self.mem[n + offset]
+        # OAM DMA takes 160 M-cycles. The CPU can't touch the source (or
+        # anything off the 0xFF page) meanwhile, so all 160 bytes are
+        # copied now and the bus is blocked until dma_done.
+        self.IO[0x46] = val
+        pages = self.read_pages if self._dma_pages is None else self._dma_pages[0]
+        # Sources from 0xE000 up see work RAM, like echo RAM
+        src = cast(memoryview, pages[val - 0x20 if val >= 0xE0 else val])
+        self.OAM[:] = src[:0xA0]
+        self.oam_written = True
+        self.block_bus()
+        self.scheduler.schedule(self.dma_done, self.scheduler.now + DMA_CYCLES)
+
+    def block_bus(self) -> None:
+        if self._dma_pages is None:
+            self._dma_pages = (self.read_pages[:0xFF], self.write_pages[:0xFF])
+            self.read_pages[:0xFF] = self._bus_read
+            self.write_pages[:0xFF] = self._bus_write
+            self.dma_active = True
+
+    def dma_done(self) -> None:
+        if self._dma_pages is not None:
+            self.read_pages[:0xFF], self.write_pages[:0xFF] = self._dma_pages
+            self._dma_pages = None
+            self.dma_active = False
+
+    def take_dirty_tiles(self) -> int:
+        dirty = self.dirty_tiles
+        self.dirty_tiles = 0
+        return dirty
+
+    def take_dirty_rows(self) -> int:
+        dirty = self.dirty_rows
+        self.dirty_rows = 0
+        return dirty
+
+    def write_vram(self, addr:int, data:bytes) -> None:
+        # Bulk copy into VRAM, marking everything it covers
+        start = addr - 0x8000
+        end = start + len(data)
+        self._vram[start:end] = data
+        tiles = min(end, 0x1800)
+        if start < tiles:
+            self.dirty_tiles |= (1 << ((tiles + 15) >> 4)) - (1 << (start >> 4))
+        start = max(start, 0x1800) - 0x1800
+        if end > 0x1800:
+            self.dirty_rows |= (1 << ((end - 0x1800 + 31) >> 5)) - (1 << (start >> 5))
+
+    def save_state(self) -> Tuple[int, bool]:
+        # mem itself is copied as it is
+        return (self.link_buffer, self.dma_active)
+
+    def load_state(self, state:Tuple[int, bool], mem:ByteString) -> None:
+        self.link_buffer, dma_active = state
+        # Recompiled code whose bytes change goes, as if written
+        code_map = self.code_map
+        addr = code_map.find(1)
+        while addr >= 0:
+            if self.mem[addr] != mem[addr]:
+                self.code_write(addr)
+            addr = code_map.find(1, addr + 1)
+        self.mem[:] = mem
+        self.dirty_tiles = ALL_TILES
+        self.dirty_rows = ALL_ROWS
+        self.oam_written = True
+        self.dma_done()
+        if dma_active:
+            self.block_bus()
 
     def __getitem__(self, val:int) -> int:
-        if val < 0xE000:
-            return self.view[val]
-        elif val < 0xFE00:
-            # Echo RAM, subtract 0x2000
-            return self.view[val-0x2000]
-        elif val < 0xFE80:
-            return self.OAM[val-0xFE00]
-        elif val < 0xFF00:
-            return 0xFF
-        elif val < 0xFF80:
-            if val in self._io_handlers:
-                return self._io_handlers[val].value
-            elif val == 0xFF00:
-                return self._ui.input
-            else:
-                return self.IO[val-0xFF00]
-        elif val < 0xFFFF:
-            return self._HiRAM[val-0xFF80]
-        elif val == 0xFFFF:
-            return self.mem[0xFFFF]
-        raise ValueError("Access out of bounds")
+        return self.read_pages[val >> 8][val & 0xFF]
 
     def __setitem__(self, key:int, val:int) -> None:
-        if key < 0x8000:
-            self.mbc[key] = val
-        elif key < 0xA000:
-	        self._vram[key-0x8000] = val
-        elif key < 0xC000:
-            if self.mbc.ram_enabled:
-                # TODO: Read $0x149 and determine RAM Size
-                # TODO: Pass to MBC
-                self._eram[key-0xA000] = val
-        elif key < 0xE000:
-	        self._wram[key-0xC000] = val
-        elif key < 0xFE00:
-	        self._wram[key-0xE000] = val
-        elif key < 0xFEA0:
-	        self.OAM[key-0xFE00] = val
-        elif key < 0xFF00:
-            pass
-        elif key < 0xFF80:
-            if key in self._io_handlers:
-                self._io_handlers[key].value = val
-            if key == 0xFF00:
-                self._ui.input = val
-            elif key == 0xFF01:
-                self.link_buffer = val
-            elif key == 0xFF02:
-                if val == 0x81:
-                    self.serial_buff += chr(self.link_buffer)
-                    if self.link_buffer == ord("\n"):
-                        print(self.serial_buff, end='', file=sys.stderr)
-                        # Test ROM Routines
-                        if self.serial_buff == "Passed\n":
-                            #sys.exit(0)
-                            pass
-                        elif self.serial_buff ==  "Failed\n":
-                            #sys.exit(1)
-                            pass
-                        self.serial_buff = ""
+        self.write_pages[key >> 8][key & 0xFF] = val
+        if self.code_map[key]:
+            self.code_write(key)
+
+    def add_io(self, addr:int, read:Optional[Callable[[], int]] = None,
+               write:Optional[Callable[[int], None]] = None) -> None:
+        # Written values are always kept in IO, after write has seen them
+        offset = addr - 0xFF00
+        io = self.IO
+        sync = self.scheduler.sync
+        self.io_reads[offset] = read
+        if write is None:
+            if addr in SYNC_IO:
+                def store(val:int) -> None:
+                    io[offset] = val
+                    sync()
+                self.io_writes[offset] = store
             else:
-                self.IO[key-0xFF00] = val
-        elif key < 0xFFFF:
-	        self._HiRAM[key-0xFF80] = val
+                self.io_writes[offset] = None
+            return
+        handler = write
+        if addr in SYNC_IO:
+            def write_sync(val:int) -> None:
+                handler(val)
+                io[offset] = val
+                sync()
+            self.io_writes[offset] = write_sync
         else:
-            self.mem[65535] = val
+            def write_store(val:int) -> None:
+                handler(val)
+                io[offset] = val
+            self.io_writes[offset] = write_store
 
-    def add_io_handler(self, val:int, handler:Register) -> None:
-        self._io_handlers[val] = handler
+    def add_io_handler(self, addr:int, handler:Register) -> None:
+        # The value property's own getter and setter go in the table, so
+        # an access costs one call rather than a property lookup as well
+        prop = getattr(type(handler), "value")
+        self.add_io(addr, prop.fget.__get__(handler), prop.fset.__get__(handler))
@@ -0,0 +1,326 @@
+import ast
+import re
+from textwrap import indent
+from typing import Dict, List, Optional, Set, Tuple
+
+# Python source for every opcode, written against plain names so it can be
+# pasted into generated code:
+#   A B C D E H L SP PC   registers
+#   fZ fN fH fC           flags
+#   m                     the memory bus (MMU)
+#   r                     the register file, for HALT/STOP/IME/ei only
+#   n                     the immediate operand (if any)
+#   t u v                 scratch
+#   extra                 cycles a conditional branch takes when taken,
+#                         on top of the instruction table's not-taken time
+# Both the interpreter's handlers (instruction.py) and the block
+# recompiler (recompiler.py) are generated from this.
+
+REGISTERS = ("A", "B", "C", "D", "E", "H", "L", "SP", "fZ", "fN", "fH", "fC")
+FLAGS = ("fZ", "fN", "fH", "fC")
+R8 = ("B", "C", "D", "E", "H", "L", "(HL)", "A")
+R16 = (("B", "C"), ("D", "E"), ("H", "L"))
+CONDITIONS = ("not fZ", "fZ", "not fC", "fC")  # NZ, Z, NC, C
+# JR and JP, the branches that can close a loop
+JUMPS = (0x18, 0x20, 0x28, 0x30, 0x38, 0xC2, 0xC3, 0xCA, 0xD2, 0xDA)
+SIGNED_N = "(n - 256 if n > 127 else n)"
+
+
+def inline_memory(source: str) -> str:
+    # For generated code: index p and w, the MMU's read and write pages,
+    # instead of calling MMU.__getitem__/__setitem__. Stores still tell
+    # the MMU about writes to code.
+    def store(match: "re.Match[str]") -> str:
+        space, addr, val = match.groups()
+        if addr.isidentifier():
+            page = f"w[{addr} >> 8][{addr} & 0xFF] = {val}"
+        else:
+            page, addr = f"w[(a_ := {addr}) >> 8][a_ & 0xFF] = {val}", "a_"
+        return (f"{space}{page}\n{space}if m.code_map[{addr}]:\n"
+                f"{space}    m.code_write({addr})")
+
+    def load(match: "re.Match[str]") -> str:
+        # Addresses are side-effect free, evaluating them twice is fine
+        addr = match.group(1)
+        if not addr.isidentifier():
+            addr = f"({addr})"
+        return f"p[{addr} >> 8][{addr} & 0xFF]"
+    source = re.sub(r"^( *)m\[([^\[\]]+)\] = (.*)$", store, source, flags=re.M)
+    return re.sub(r"\bm\[([^\[\]]+)\]", load, source)
+
+
+def _read(op: str) -> str:
+    return "m[(H << 8) | L]" if op == "(HL)" else op
+
+
+def _write(op: str, val: str) -> str:
+    return f"m[(H << 8) | L] = {val}" if op == "(HL)" else f"{op} = {val}"
+
+
+def _modify(op: str, body: str) -> str:
+    # Read the operand into t, run body, write t back
+    if op == "(HL)":
+        return f"u = (H << 8) | L\nt = m[u]\n{body}\nm[u] = t"
+    return f"t = {op}\n{body}\n{op} = t"
+
+
+def _pair(hi: str, lo: str) -> str:
+    return f"(({hi} << 8) | {lo})"
+
+
+def _set_pair(hi: str, lo: str, val: str) -> str:
+    return f"t = {val}\n{hi} = t >> 8\n{lo} = t & 0xFF"
+
+
+def _if(cond: str, body: str) -> str:
+    return f"if {cond}:\n{indent(body, '    ')}"
+
+
+def _push(hi: str, lo: str) -> str:
+    return f"SP -= 1\nm[SP] = {hi}\nSP -= 1\nm[SP] = {lo}"
+
+
+def _pop(hi: str, lo: str) -> str:
+    return f"{lo} = m[SP]\nSP += 1\n{hi} = m[SP]\nSP += 1"
+
+
+CALL = _push("PC >> 8", "PC & 0xFF") + "\nPC = n"
+RET = "t = m[SP]\nSP += 1\nPC = (m[SP] << 8) + t\nSP += 1"
+JR = f"PC = PC + {SIGNED_N}"
+EI = "if not r.IME:\n    r.ei = 1"
+
+INC = "fH = (t & 0xF) == 0xF\nt = (t + 1) & 0xFF\nfZ = t == 0\nfN = False"
+DEC = "t = (t - 1) & 0xFF\nfZ = t == 0\nfN = True\nfH = (t & 0xF) == 0xF"
+
+ALU = {
+    "ADD": "v = A + t\nfH = (A & 0x0F) + (t & 0x0F) > 0x0F\nfC = v > 0xFF\nfN = False\nA = v & 0xFF\nfZ = A == 0",
+    "ADC": "v = A + t + fC\nfZ = (v & 0xFF) == 0\nfH = (A & 0x0F) + (t & 0x0F) + fC > 0x0F\nfC = v > 0xFF\nfN = False\nA = v & 0xFF",
+    "SUB": "fZ = A == t\nfH = (A & 0xF) < (t & 0xF)\nfN = True\nfC = A < t\nA = (A - t) & 0xFF",
+    "SBC": "u = fC\nv = A - t - u\nfZ = (v & 0xFF) == 0\nfN = True\nfC = v < 0\nfH = (A & 0x0F) - (t & 0x0F) - u < 0\nA = v & 0xFF",
+    "AND": "A &= t\nfZ = A == 0\nfN = False\nfH = True\nfC = False",
+    "XOR": "A ^= t\nfZ = A == 0\nfH = False\nfN = False\nfC = False",
+    "OR":  "A |= t\nfZ = A == 0\nfH = False\nfN = False\nfC = False",
+    "CP":  "fZ = A == t\nfH = (A & 0xF) < (t & 0xF)\nfN = True\nfC = A < t",
+}
+
+SHIFT = {
+    "RLC":  "v = (t << 1) + (t >> 7)\nfZ = (v & 0xFF) == 0\nfC = v > 0xFF\nfH = False\nfN = False\nt = v & 0xFF",
+    "RRC":  "fC = (t & 0x1) == 0x1\nfH = False\nfN = False\nt >>= 1\nif fC:\n    t |= 0x80\nfZ = t == 0",
+    "RL":   "v = (t << 1) + fC\nfH = False\nfN = False\nfZ = (v & 0xFF) == 0\nfC = v > 0xFF\nt = v & 0xFF",
+    "RR":   "v = fC\nfC = t & 0x1 == 0x1\nfH = False\nfN = False\nt >>= 1\nif v:\n    t |= 0x80\nfZ = t == 0",
+    "SLA":  "v = t << 1\nfZ = (v & 0xFF) == 0\nfC = v > 0xFF\nfH = False\nfN = False\nt = v & 0xFF",
+    "SRA":  "v = ((t >> 1) | (t & 0x80)) + ((t & 1) << 8)\nfZ = (v & 0xFF) == 0\nfC = v > 0xFF\nfH = False\nfN = False\nt = v & 0xFF",
+    "SWAP": "fZ = t == 0\nfN = False\nfH = False\nfC = False\nt = ((t << 4) & 0xFF) | (t >> 4)",
+    "SRL":  "fC = (t & 0x1) != 0\nt >>= 1\nfZ = t == 0\nfH = False\nfN = False",
+}
+
+DAA = """\
+if not fN:
+    if fC or A > 0x99:
+        A = (A + 0x60) & 0xFF
+        fC = True
+    if fH or (A & 0x0F) > 0x09:
+        A = (A + 0x6) & 0xFF
+else:
+    if fC:
+        A = (A - 0x60) & 0xFF
+    if fH:
+        A = (A - 0x6) & 0xFF
+fZ = A == 0
+fH = False"""
+
+
+def _add16(src: str) -> str:
+    return (f"t = (H << 8) | L\nu = {src}\nv = t + u\nfN = False\nfC = v > 0xFFFF\n"
+            "fH = (t & 0x0FFF) + (u & 0x0FFF) > 0x0FFF\nH = (v & 0xFFFF) >> 8\nL = v & 0xFF")
+
+
+def _sp_plus_n(dest: str) -> str:
+    return (f"t = (SP + {SIGNED_N}) & 0xFFFF\nfH = (SP & 0xF) + (n & 0xF) > 0xF\n"
+            f"fC = (SP & 0xFF) + (n & 0xFF) > 0xFF\nfN = False\nfZ = False\n{dest}")
+
+
+def _build() -> Dict[int, str]:
+    src: Dict[int, str] = {}
+    pairs = R16 + (("S", "P"),)
+
+    src[0x00] = "pass"
+    src[0x07] = "t = A\n" + SHIFT["RLC"] + "\nA = t\nfZ = False"
+    src[0x08] = "m[n] = SP & 0xFF\nm[n + 1] = SP >> 8"
+    src[0x0F] = "t = A\n" + SHIFT["RRC"] + "\nA = t\nfZ = False"
+    src[0x10] = "r.STOP = True"
+    src[0x17] = "t = A\n" + SHIFT["RL"] + "\nA = t\nfZ = False"
+    src[0x18] = JR
+    src[0x1F] = "t = A\n" + SHIFT["RR"] + "\nA = t\nfZ = False"
+    src[0x27] = DAA
+    src[0x2F] = "A = (~A) & 0xFF\nfN = True\nfH = True"
+    src[0x37] = "fC = True\nfH = False\nfN = False"
+    src[0x3F] = "fC = not fC\nfH = False\nfN = False"
+
+    for i, (hi, lo) in enumerate(pairs):
+        base = i << 4
+        if hi == "S":
+            src[base + 0x01] = "SP = n"
+            src[base + 0x03] = "SP = (SP + 1) & 0xFFFF"
+            src[base + 0x09] = _add16("SP")
+            src[base + 0x0B] = "SP = (SP - 1) & 0xFFFF"
+        else:
+            src[base + 0x01] = f"{hi} = n >> 8\n{lo} = n & 0xFF"
+            src[base + 0x03] = _set_pair(hi, lo, f"({_pair(hi, lo)} + 1) & 0xFFFF")
+            src[base + 0x09] = _add16(_pair(hi, lo))
+            src[base + 0x0B] = _set_pair(hi, lo, f"({_pair(hi, lo)} - 1) & 0xFFFF")
+
+    # LD (rr),A / LD A,(rr) incl. HL+ and HL-
+    src[0x02] = "m[(B << 8) | C] = A"
+    src[0x12] = "m[(D << 8) | E] = A"
+    src[0x0A] = "A = m[(B << 8) | C]"
+    src[0x1A] = "A = m[(D << 8) | E]"
+    for code, step in ((0x22, "+ 1"), (0x32, "- 1")):
+        src[code] = f"u = (H << 8) | L\nm[u] = A\nu = (u {step}) & 0xFFFF\nH = u >> 8\nL = u & 0xFF"
+        src[code + 0x08] = f"u = (H << 8) | L\nA = m[u]\nu = (u {step}) & 0xFFFF\nH = u >> 8\nL = u & 0xFF"
+
+    for i, op in enumerate(R8):
+        src[0x04 + (i << 3)] = _modify(op, INC)
+        src[0x05 + (i << 3)] = _modify(op, DEC)
+        src[0x06 + (i << 3)] = _write(op, "n")
+
+    for i, cond in enumerate(CONDITIONS):
+        src[0x20 + (i << 3)] = _if(cond, f"{JR}\nextra = 4")
+        src[0xC0 + (i << 3)] = _if(cond, f"{RET}\nextra = 12")
+        src[0xC2 + (i << 3)] = _if(cond, "PC = n\nextra = 4")
+        src[0xC4 + (i << 3)] = _if(cond, f"{CALL}\nextra = 12")
+
+    for i, dest in enumerate(R8):
+        for j, source in enumerate(R8):
+            if dest == source == "(HL)":
+                src[0x76] = "r.HALT = True"
+            else:
+                src[0x40 + (i << 3) + j] = _write(dest, _read(source))
+
+    for i, (name, body) in enumerate(ALU.items()):
+        for j, op in enumerate(R8):
+            src[0x80 + (i << 3) + j] = f"t = {_read(op)}\n{body}"
+        src[0xC6 + (i << 3)] = f"t = n\n{body}"
+
+    for i, (hi, lo) in enumerate(R16):
+        src[0xC1 + (i << 4)] = _pop(hi, lo)
+        src[0xC5 + (i << 4)] = _push(hi, lo)
+    src[0xF1] = "t = m[SP]\nSP += 1\nA = m[SP]\nSP += 1\n" \
+                "fZ = t & 0x80 != 0\nfN = t & 0x40 != 0\nfH = t & 0x20 != 0\nfC = t & 0x10 != 0"
+    src[0xF5] = _push("A", "(fZ << 7) | (fN << 6) | (fH << 5) | (fC << 4)")
+
+    for i in range(8):
+        src[0xC7 + (i << 3)] = CALL.replace("PC = n", f"PC = 0x{i << 3:02X}")
+
+    src[0xC3] = "PC = n"
+    src[0xC9] = RET
+    src[0xCD] = CALL
+    src[0xD9] = RET + "\n" + EI
+    src[0xE0] = "m[0xFF00 + n] = A"
+    src[0xE2] = "m[0xFF00 + C] = A"
+    src[0xE8] = _sp_plus_n("SP = t")
+    src[0xE9] = "PC = (H << 8) | L"
+    src[0xEA] = "m[n] = A"
+    src[0xF0] = "A = m[(0xFF00 + n) & 0xFFFF]"
+    src[0xF2] = "A = m[0xFF00 + C]"
+    src[0xF3] = "r.IME = False"
+    src[0xF8] = _sp_plus_n("H = t >> 8\nL = t & 0xFF")
+    src[0xF9] = "SP = (H << 8) | L"
+    src[0xFA] = "A = m[n]"
+    src[0xFB] = EI
+    return src
+
+
+def _build_cb() -> Dict[int, str]:
+    src: Dict[int, str] = {}
+    for i, body in enumerate(SHIFT.values()):
+        for j, op in enumerate(R8):
+            src[(i << 3) + j] = _modify(op, body)
+    for b in range(8):
+        for j, op in enumerate(R8):
+            src[0x40 + (b << 3) + j] = f"fH = True\nfZ = ({_read(op)} & 0x{1 << b:02X}) == 0\nfN = False"
+            src[0x80 + (b << 3) + j] = _modify(op, f"t &= 0x{~(1 << b) & 0xFF:02X}")
+            src[0xC0 + (b << 3) + j] = _modify(op, f"t |= 0x{1 << b:02X}")
+    return src
+
+
+SOURCE = _build()
+CB_SOURCE = _build_cb()
+
+
+class Op():
+    # An opcode's source plus what code generators need to know about it
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.reads: Set[str] = set()
+        self.writes: Set[str] = set()
+        self.stores = False  # writes memory
+        self.exits = False   # changes PC or CPU state the run loop checks
+        self.syncs = False   # changes HALT/STOP/IME/ei, which the scheduler must see
+        self.addresses: List[str] = []  # expressions for the memory it reads
+        self.taken = 0  # extra cycles when a conditional branch is taken
+        tree = ast.parse(source)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                if isinstance(node.ctx, ast.Store):
+                    self.writes.add(node.id)
+                else:
+                    self.reads.add(node.id)
+            elif isinstance(node, ast.Subscript) and isinstance(node.ctx, ast.Store):
+                self.stores = True
+            elif isinstance(node, ast.Subscript):
+                self.addresses.append(ast.unparse(node.slice))
+            elif isinstance(node, ast.Attribute) and isinstance(node.ctx, ast.Store):
+                self.exits = True
+                self.syncs = True
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+                self.reads.add(node.target.id)
+            if (isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name)
+                    and node.targets[0].id == "extra" and isinstance(node.value, ast.Constant)
+                    and isinstance(node.value.value, int)):
+                self.taken = node.value.value
+        if "PC" in self.writes:
+            self.exits = True
+
+        # defined: always assigned, live_in: read before being assigned
+        self.defined: Set[str] = set()
+        self.live_in: Set[str] = set()
+        for stmt in tree.body:
+            for node in ast.walk(stmt):
+                if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Store):
+                    if node.id not in self.defined:
+                        self.live_in.add(node.id)
+            if isinstance(stmt, ast.AugAssign) and isinstance(stmt.target, ast.Name):
+                if stmt.target.id not in self.defined:
+                    self.live_in.add(stmt.target.id)
+            if isinstance(stmt, (ast.Assign, ast.AugAssign)):
+                for node in ast.walk(stmt):
+                    if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                        self.defined.add(node.id)
+        # Conditionally assigned names have to start with their old value
+        self.live_in |= self.writes - self.defined
+
+        # Top-level statements as (source, flag, defines, reads) so flag
+        # assignments nobody reads can be dropped. flag is set when the
+        # statement does nothing but assign that flag.
+        self.statements: List[Tuple[str, Optional[str], Set[str], Set[str]]] = []
+        lines = source.split("\n")
+        for stmt in tree.body:
+            text = "\n".join(lines[stmt.lineno - 1:stmt.end_lineno])
+            reads = {node.id for node in ast.walk(stmt)
+                     if isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Store)}
+            defines: Set[str] = set()
+            if isinstance(stmt, ast.AugAssign) and isinstance(stmt.target, ast.Name):
+                reads.add(stmt.target.id)
+            if isinstance(stmt, (ast.Assign, ast.AugAssign)):
+                defines = {node.id for node in ast.walk(stmt)
+                           if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store)}
+            flag = None
+            if (isinstance(stmt, ast.Assign) and len(defines) == 1 and defines <= set(FLAGS)
+                    and not any(isinstance(node, ast.Subscript) for node in ast.walk(stmt))):
+                flag = next(iter(defines))
+            self.statements.append((text, flag, defines, reads))
+
+
+OPS = {op: Op(src) for op, src in SOURCE.items()}
+CB_OPS = {op: Op(src) for op, src in CB_SOURCE.items()}
@@ -0,0 +1,61 @@
+import time
+from typing import Callable
+
+CLOCK = 4194304
+FRAME_CYCLES = 154 * 456  # lines of a frame, cycles of a line
+FRAME_RATE = CLOCK / FRAME_CYCLES  # 59.73 Hz
+MAX_CATCH_UP = 4  # frames run in one go before the rest are dropped
+
+
+class Pacer():
+    # Runs frames against the host's clock. Frame n is due at
+    # start + n / (FRAME_RATE * speed); each tick runs every frame due,
+    # so a late tick is made up by the next rather than lost. When too
+    # far behind, the frames beyond MAX_CATCH_UP are dropped and the
+    # schedule starts over from now. A speed of 0 runs uncapped.
+
+    def __init__(self, advance: Callable[[float], None], speed: float = 1.0) -> None:
+        self.advance = advance
+        self.frames = 0
+        self.dropped = 0
+        self._counted = 0
+        self._measured = time.perf_counter()
+        self.set_speed(speed)
+
+    def set_speed(self, speed: float) -> None:
+        self.speed = speed
+        self._start = time.perf_counter()
+        self._done = 0
+
+    def tick(self) -> float:
+        # Run the frames due; returns the seconds until the next one
+        if not self.speed:
+            self.advance(0.0)
+            self.frames += 1
+            self._counted += 1
+            return 0.0
+        period = 1 / (FRAME_RATE * self.speed)
+        now = time.perf_counter()
+        due = int((now - self._start) / period) + 1 - self._done
+        if due > MAX_CATCH_UP:
+            self.dropped += due - MAX_CATCH_UP
+            self._start = now - (MAX_CATCH_UP - 1) * period
+            self._done = 0
+            due = MAX_CATCH_UP
+        for _ in range(due):
+            # dt as advance_frame expects: a period, plus however late
+            # this frame is, so the PPU can skip drawing when behind
+            late = now - (self._start + self._done * period)
+            self.advance(period + late)
+            self._done += 1
+        self.frames += due
+        self._counted += due
+        return self._start + self._done * period - time.perf_counter()
+
+    def measure(self) -> float:
+        # Emulation speed since the last call, 1.0 being a Game Boy's
+        now = time.perf_counter()
+        speed = self._counted / ((now - self._measured) * FRAME_RATE)
+        self._counted = 0
+        self._measured = now
+        return speed
@@ -1,15 +1,37 @@
-from array import array
 import functools
+import threading
+from typing import Any, ByteString, Callable, List, Optional, Tuple
 from mmu import MMU
-from interface import Interface
-
-from pyglet.gl import GLubyte
+from frontend import Frontend
 
 from reg import LCDC, Register, STAT
 
 ROWS, COLS = 144, 160
 TILES = 384
 
+# Render levels: which frames are turned into pixels. LY, STAT, LYC and the
+# interrupts run exactly the same at every level.
+RENDER_FULL = 0  # every frame
+RENDER_SKIP = 1  # one frame in frame_skip
+RENDER_AUTO = 2  # skip frames while the host is behind
+RENDER_OFF = 3   # no pixels at all
+RENDER_LEVELS = {"full": RENDER_FULL, "skip": RENDER_SKIP, "auto": RENDER_AUTO, "off": RENDER_OFF}
+MAX_AUTO_SKIP = 4  # frames auto skips in a row before drawing one anyway
+
+# A tile row byte with its bits spread out, bit n to byte n: the two bytes
+# of a row combine into the 8 pixels' color codes, big end first
+SPREAD = [sum(((b >> n) & 1) << (8 * n) for n in range(8)) for b in range(256)]
+
+# bytes.translate tables for sprites. A sprite pixel is its color code |
+# OBP1 << 2 | behind BG << 3, 0 where transparent; OBJ_ROWS turns color
+# codes into those, by OBP1 | behind << 1.
+OBJ_ROWS = [bytes(c and c | (k & 1) << 2 | (k >> 1) << 3 for c in range(4)).ljust(256, b"\0")
+            for k in range(4)]
+OPAQUE = bytes(0xFF if v else 0 for v in range(256))
+BG_OPAQUE = bytes((0, 0x10, 0x10, 0x10)).ljust(256, b"\0")  # BG color codes 1-3
+# Sprite pixel | BG_OPAQUE to 0xFF where the sprite shows
+VISIBLE = bytes(0xFF if v & 3 and not (v & 8 and v & 0x10) else 0 for v in range(256))
+
 
 @functools.lru_cache()
 def color_code(byte1: int, byte2: int, offset: int) -> int:
@@ -17,19 +39,32 @@ def color_code(byte1: int, byte2: int, offset: int) -> int:
 
 
 class PPU():
-    def __init__(self, interface: Interface, mem: MMU) -> None:
+    def __init__(self, interface: Frontend, mem: MMU) -> None:
         self.vram = mem._vram
         self.OAM = mem.OAM
         self.io = mem.IO
         self.mem = mem
         self._ui = interface
 
-        base = bytearray([0xFF] * (160*144))
-
-        self._screenbuffer = (GLubyte * (160*144))(*base)
-        self._tiles = array("B", [0xFF] * (TILES*8*8))
-        self._sprites0 = array("B", [0xFF] * (TILES*8*8))
-        self._sprites1 = array("B", [0xFF] * (TILES*8*8))
+        self.screens = Screens()
+        self._screenbuffer = self.screens.back
+        self._frame_listeners: List[Callable[[bytearray], None]] = []
+        # Color codes 0-3, 8 per tile row; palettes map them to shades
+        # as each scanline is drawn
+        self._tiles = bytearray(TILES*8*8)
+        self._line = bytearray(160)  # color codes of the scanline being drawn
+        self._flipped = bytearray(TILES*8*8)  # _tiles with each row reversed
+        self._objects = bytearray(COLS + 16)
+        self._sprite_lines: List[List[Tuple[int, int, bytearray, bytes]]] = [[] for _ in range(ROWS)]
+        self._sprite_height = False  # LCDC.sprite_height the lines were indexed for
+        # Each tile map drawn out as 256x256 color codes, once with unsigned
+        # and once with signed tile numbers. A layer is brought up to date
+        # when a scanline uses it, from the tiles and map rows written
+        # since, and the map as it was last drawn.
+        self._layers = [bytearray(256*256) for _ in range(4)]
+        self._layer_cells: List[Optional[bytes]] = [None] * 4
+        self._layer_tiles = [0] * 4
+        self._layer_rows = [0] * 4
 
         self._LCDC = LCDC()
         self._STAT = STAT()
@@ -37,7 +72,6 @@ class PPU():
         self.OBP0 = Palette()
         self.OBP1 = Palette()
         self.ly_window = -1
-        self.alpha = 0xCC  # TODO: this needs a home
 
         mem.add_io_handler(0xFF40, self._LCDC)
         mem.add_io_handler(0xFF41, self._STAT)
@@ -49,6 +83,39 @@ class PPU():
         self.vblank_toggle = False
         self.frames = 0
 
+        self.render_level = RENDER_FULL
+        self._frame_skip = 2
+        self.behind = False  # set by the host when it can't keep up
+        self.drawing = True  # whether this frame is being rendered
+        self.skipped = 0     # frames skipped in a row
+
+        # clock() only runs when the scheduler says something changes
+        self.scheduler = mem.scheduler
+        self.last = 0  # scheduler time of the last clock()
+        self.scheduler.add_device(self.update)
+        self.scheduler.schedule(self.update, 0)
+
+    def update(self) -> None:
+        now = self.scheduler.now
+        self.clock(now - self.last)
+        self.last = now
+        self.scheduler.schedule(self.update, now + self.next_change())
+
+    def next_change(self) -> int:
+        # Cycles until clock() would do something other than repeat itself
+        scancycle = self.scancycle
+        if not self._LCDC.screen_on:
+            return 69769 - scancycle
+        mode = self._STAT.mode
+        if mode != 1:
+            if scancycle <= 80:
+                return 81 - scancycle if mode == 2 else 1
+            if scancycle <= 248:
+                return 249 - scancycle if mode == 3 else 1
+            if mode != 0:
+                return 1
+        return 456 - scancycle
+
     def clock(self, cycles: int) -> None:
         scancycle = self.scancycle + cycles
         self.scancycle = scancycle
@@ -71,9 +138,11 @@ class PPU():
                 self.scancycle = scancycle % 456
                 scanline = self.io[0x44]
                 if scanline < 144:
-                    self.render_scanline(scanline)
+                    if self.drawing:
+                        self.render_scanline(scanline)
                 elif scanline == 144:
-                    self.frame()
+                    if self.drawing:
+                        self.frame()
                     if self.mem.mem[0xFFFF] & 0b00001:
                         self.mem.mem[0xFF0F] |= 0b00001
                     if self.mem.mem[0xFFFF] & 0b00010:
@@ -85,6 +154,7 @@ class PPU():
                     self._STAT.mode = 2
                     scanline = -1
                     self.frames += 1
+                    self.start_frame()
                 self.io[0x44] = scanline + 1
                 if scanline == self.io[0x45]:
                     self._STAT.lyc_eq_ly = True
@@ -98,45 +168,179 @@ class PPU():
             self.io[0x44] = 0
             if self.scancycle > 69768:  # A whole frame has elapsed
                 self.scancycle %= 69768
-                self.clear_framebuffer()
+                if self.drawing:
+                    self.clear_framebuffer()
+                    self.frame()
                 self.frames += 1
-                self.frame()
+                self.start_frame()
             return
 
-    def render_scanline_fastly(self, scanline: int) -> None:
-        scx = self.io[0x43]        # SCX
-        scy = self.io[0x42]        # SCY
-        mapoffs = 0x1800 if self._LCDC.bg_tile_map_select == 0 else 0x1C00
-
-        mapoffs += (((scanline+scy) & 255) >> 3) << 5
+    def save_state(self) -> Tuple[Any, ...]:
+        # The frame being drawn is screens.back, copied as it is. LCDC and
+        # STAT go field by field: they don't always agree with _value.
+        lcdc = self._LCDC
+        stat = self._STAT
+        return (self.scancycle, self.frames, self.ly_window, self.last, self.drawing, self.skipped,
+                lcdc._value, lcdc.screen_on, lcdc.windowmap_select, lcdc.window_enable,
+                lcdc.tile_data_select, lcdc.bg_tile_map_select, lcdc.sprite_height,
+                lcdc.sprite_enable, lcdc.bg_enable,
+                stat._value, stat.lyc_eq_ly_enabled, stat.mode_2_OAM_enable, stat.mode_1_vblank_enable,
+                stat.mode_0_hblank_enable, stat.lyc_eq_ly, stat.mode,
+                *(x for p in (self.bg_palette, self.OBP0, self.OBP1) for x in (p.value, bytes(p.arr))))
+
+    def load_state(self, state: Tuple[Any, ...], screen: ByteString) -> None:
+        # Decoded tiles, layers and sprites are redone from VRAM and OAM,
+        # which MMU.load_state marks as all written
+        lcdc = self._LCDC
+        stat = self._STAT
+        (self.scancycle, self.frames, self.ly_window, self.last, self.drawing, self.skipped,
+         lcdc._value, lcdc.screen_on, lcdc.windowmap_select, lcdc.window_enable,
+         lcdc.tile_data_select, lcdc.bg_tile_map_select, lcdc.sprite_height,
+         lcdc.sprite_enable, lcdc.bg_enable,
+         stat._value, stat.lyc_eq_ly_enabled, stat.mode_2_OAM_enable, stat.mode_1_vblank_enable,
+         stat.mode_0_hblank_enable, stat.lyc_eq_ly, stat.mode) = state[:22]
+        palettes = (self.bg_palette, self.OBP0, self.OBP1)
+        for n, palette in enumerate(palettes):
+            palette._value = state[22 + n*2]
+            palette.arr = bytearray(state[23 + n*2])
+            palette.table = bytes(palette.arr).ljust(256, b"\0")
+        self._screenbuffer[:] = screen
 
-        lineoffs = scx >> 3
-
-        x = scx & 7
-        y = (scanline+scy) & 7
-
-        pixelOffset = 0
-
-        pixelOffset = scanline * 160
-
-        tile = self.vram[mapoffs+lineoffs]
-
-        if not self._LCDC.tile_data_select and tile < 128:
-            tile += 256
+    @property
+    def frame_skip(self) -> int:
+        return self._frame_skip
+
+    @frame_skip.setter
+    def frame_skip(self, frame_skip: int) -> None:
+        # RENDER_SKIP draws one frame in frame_skip
+        if frame_skip < 1:
+            raise ValueError(f"frame_skip must be at least 1, not {frame_skip}")
+        self._frame_skip = frame_skip
+
+    def start_frame(self) -> None:
+        # Decided once per frame, so a frame is drawn whole or not at all
+        level = self.render_level
+        if level == RENDER_SKIP:
+            self.drawing = self.frames % self.frame_skip == 0
+        elif level == RENDER_AUTO:
+            self.drawing = not self.behind or self.skipped >= MAX_AUTO_SKIP
+        else:
+            self.drawing = level == RENDER_FULL
+        self.skipped = 0 if self.drawing else self.skipped + 1
+
+    def decode_tiles(self) -> None:
+        # Bring the decoded tiles up to date with VRAM: only the tiles
+        # written since the last call. The layers catch up when used.
+        dirty = self.mem.take_dirty_tiles()
+        rows = self.mem.take_dirty_rows()
+        if dirty or rows:
+            for n in range(4):
+                self._layer_tiles[n] |= dirty
+                self._layer_rows[n] |= (rows >> (n >> 1) * 32) & 0xFFFFFFFF
+        vram = self.vram
+        tiles = self._tiles
+        flipped = self._flipped
+        while dirty:
+            low = dirty & -dirty
+            dirty ^= low
+            t = (low.bit_length() - 1) * 16
+            for k in range(t, t + 16, 2):  # 2 bytes for each line
+                pos = k * 4
+                codes = SPREAD[vram[k]] | SPREAD[vram[k + 1]] << 1
+                tiles[pos:pos + 8] = codes.to_bytes(8, "big")
+                flipped[pos:pos + 8] = codes.to_bytes(8, "little")
+
+    def update_layer(self, n: int) -> bytearray:
+        # Redraw the cells of layer n whose map entry or tile has changed
+        # since it was last used. Layer n is tile map n >> 1, with signed
+        # tile numbers if n & 1.
+        layer = self._layers[n]
+        old = self._layer_cells[n]
+        if old is not None and not (self._layer_tiles[n] or self._layer_rows[n]):
+            return layer
+        signed = n & 1
+        base = 0x1800 + (n >> 1) * 0x400
+        cells = self.vram[base:base + 0x400].tobytes()
+        if old is None:
+            redraw = bytearray(b"\1" * 0x400)
+        else:
+            # Map bytes that name a changed tile
+            dirty = self._layer_tiles[n]
+            mask = bytearray(256)
+            while dirty:
+                low = dirty & -dirty
+                dirty ^= low
+                t = low.bit_length() - 1
+                if t >= 128 if signed else t < 256:
+                    mask[t & 0xFF] = 1
+            redraw = bytearray(cells.translate(mask))
+            rows = self._layer_rows[n]
+            while rows:
+                low = rows & -rows
+                rows ^= low
+                i = (low.bit_length() - 1) * 32
+                for i in range(i, i + 32):
+                    if cells[i] != old[i]:
+                        redraw[i] = 1
+        self._layer_cells[n] = cells
+        self._layer_tiles[n] = 0
+        self._layer_rows[n] = 0
+
+        tiles = self._tiles
+        i = redraw.find(1)
+        while i >= 0:
+            t = cells[i]
+            if signed:
+                # (x ^ 0x80 - 128) to convert to signed, then
+                # add 256 for offset (reduces to + 128)
+                t = (t ^ 0x80) + 128
+            src = t * 64
+            dst = (i >> 5) * 2048 + (i & 31) * 8
+            for src in range(src, src + 64, 8):
+                layer[dst:dst + 8] = tiles[src:src + 8]
+                dst += 256
+            i = redraw.find(1, i + 1)
+        return layer
 
-        for _ in range(160):
-            self._screenbuffer[pixelOffset] = self._tiles[(tile * 64) + (y * 8) + x]
-            pixelOffset += 1
+    def render_scanline(self, y: int) -> None:
+        # Background and window are copied as color codes out of the layer
+        # of their tile map, then mapped through BGP in one go
+        self.decode_tiles()
+        lcdc = self._LCDC
+        wx = self.io[0x4B] - 7     # WX
+        wy = self.io[0x4A]         # WY
+        line = self._line
+        signed = not lcdc.tile_data_select
 
-            x += 1
-            if x == 8:
-                x = 0
-                lineoffs = (lineoffs + 1) & 31
-                tile = self.vram[mapoffs+lineoffs]
-                if not self._LCDC.tile_data_select and tile < 128:
-                    tile += 256
+        split = 160  # where the window starts
+        if lcdc.window_enable and wy <= y and wx < 160:
+            self.ly_window += 1
+            split = max(wx, 0)
+        if lcdc.bg_enable:
+            scx = self.io[0x43]    # SCX
+            scy = self.io[0x42]    # SCY
+            layer = self.update_layer(lcdc.bg_tile_map_select << 1 | signed)
+            row = ((y + scy) & 0xFF) * 256
+            # Wraps around at most once
+            n = min(split, 256 - scx)
+            line[:n] = layer[row + scx:row + scx + n]
+            line[n:split] = layer[row:row + split - n]
+        else:
+            line[:split] = bytes(split)
+        if split < 160:
+            layer = self.update_layer(lcdc.windowmap_select << 1 | signed)
+            row = (self.ly_window & 0xFF) * 256 - wx
+            line[split:] = layer[row + split:row + 160]
+
+        sy = 22880 - (y*160)
+        self._screenbuffer[sy:sy + 160] = line.translate(self.bg_palette.table)
+        self.render_sprites(y)
+        if y == 143:
+            self.ly_window = -1
 
-    def render_scanline(self, y: int) -> None:
+    def render_scanline_pixels(self, y: int) -> None:
+        # The same scanline a pixel at a time, kept to check the compositor
+        self.decode_tiles()
         scx = self.io[0x43]        # SCX
         scy = self.io[0x42]        # SCY
         wx = self.io[0x4B] - 7     # WX
@@ -147,6 +351,7 @@ class PPU():
 
         # Used for the half tile at the left side when scrolling
         offset = scx & 0b111
+        bgp = self.bg_palette.arr
 
         if self._LCDC.window_enable and wy <= y and wx < 160:
             self.ly_window += 1
@@ -160,7 +365,7 @@ class PPU():
                     # (x ^ 0x80 - 128) to convert to signed, then
                     # add 256 for offset (reduces to + 128)
                     wt = (wt ^ 0x80) + 128
-                self._screenbuffer[sy+x] = self._tiles[(8*(8*wt + (self.ly_window) % 8)) + (x-wx) % 8]
+                code = self._tiles[(8*(8*wt + (self.ly_window) % 8)) + (x-wx) % 8]
             elif self._LCDC.bg_enable:
                 bt = self.vram[bg_off + (y+scy) // 8 * 32 % 0x400 + (x+scx) // 8 % 32]
                 # If using signed tile indices, modify index
@@ -168,81 +373,135 @@ class PPU():
                     # (x ^ 0x80 - 128) to convert to signed, then
                     # add 256 for offset (reduces to + 128)
                     bt = (bt ^ 0x80) + 128
-                self._screenbuffer[sy+x] = self._tiles[(8*(8*bt + (y+scy) % 8)) + (x+offset) % 8]
+                code = self._tiles[(8*(8*bt + (y+scy) % 8)) + (x+offset) % 8]
             else:
-                self._screenbuffer[sy+x] = self.bg_palette[0]
+                code = 0
+            self._line[x] = code
+            self._screenbuffer[sy+x] = bgp[code]
 
-        # Render Sprites
-
-        bgpkey = self.bg_palette[0]
-        spriteheight = 16 if self._LCDC.sprite_height else 8
+        self.render_sprites(y)
+        if y == 143:
+            self.ly_window = -1
 
+    def index_sprites(self) -> None:
+        # The sprites each line shows, drawn lowest priority first: the
+        # first 10 in OAM on the line, and of those the one further left,
+        # then the one earlier in OAM, wins
+        height = 16 if self._LCDC.sprite_height else 8
+        self._sprite_height = self._LCDC.sprite_height
+        self.mem.oam_written = False
+        oam = self.OAM.tobytes()
+        found: List[List[int]] = [[] for _ in range(ROWS)]
         for n in range(0x00, 0xA0, 4):
-            obj_attr = self.OAM[n:n+4]
-            ypos = obj_attr[0] - 16
-            if ypos <= y < ypos + spriteheight:
-                xpos = obj_attr[1] - 8
-                tileindex = obj_attr[2]
-                if spriteheight == 16:
+            ypos = oam[n] - 16
+            for y in range(max(ypos, 0), min(ypos + height, ROWS)):
+                if len(found[y]) < 10:
+                    found[y].append(n)
+
+        for y, sprites in enumerate(found):
+            line = []
+            for n in sorted(sprites, key=lambda n: (oam[n + 1], n), reverse=True):
+                x = oam[n + 1]
+                if not 0 < x < COLS + 8:
+                    continue  # still counts towards the 10
+                tileindex = oam[n + 2]
+                if height == 16:
                     tileindex &= 0b11111110
-                attr = obj_attr[3]
-                flip_x = attr & 0b00100000
-                flip_y = attr & 0b01000000
-                objpriority = attr & 0b10000000
-                sprites = (self._sprites1 if attr & 0b10000 else self._sprites0)
-
-                ty = spriteheight - (y - ypos) - 1 if flip_y else y - ypos  # tile row
-                tile_row = 8 * (8 * tileindex + ty)
-                sy = 22880 - (y*160)  # screen position
-                row = range(7, -1, -1) if flip_x else range(8)  # row ordering
-                for tx in row:
-                    pos = sy + xpos
-
-                    if 0 <= xpos < COLS:
-                        pixel = sprites[tile_row + tx]
-                        if objpriority and not self._screenbuffer[pos] == bgpkey:
-                            pixel = self.alpha
-
-                        if not pixel == self.alpha:
-                            self._screenbuffer[pos] = pixel
-                    xpos += 1
+                attr = oam[n + 3]
+                ty = y - (oam[n] - 16)  # tile row
+                if attr & 0b01000000:  # flip y
+                    ty = height - ty - 1
+                tiles = self._flipped if attr & 0b00100000 else self._tiles
+                line.append((x, 8 * (8 * tileindex + ty), tiles, OBJ_ROWS[(attr >> 4) & 1 | (attr >> 6) & 2]))
+            self._sprite_lines[y] = line
+
+    def render_sprites(self, y: int) -> None:
+        # Sprite pixels are gathered in _objects, 8 pixels of margin either
+        # side, as color code | OBP1 << 2 | behind BG << 3, then blended
+        # over the line where they're opaque and not behind BG colors 1-3
+        if self.mem.oam_written or self._sprite_height != self._LCDC.sprite_height:
+            self.index_sprites()
+        line = self._sprite_lines[y]
+        if not line:
+            return
 
-        if y == 143:
-            self.ly_window = -1
+        objects = self._objects
+        objects[:] = bytes(COLS + 16)
+        for x, src, tiles, table in line:
+            row = tiles[src:src + 8].translate(table)
+            mask = int.from_bytes(row.translate(OPAQUE), "big")
+            under = int.from_bytes(objects[x:x + 8], "big")
+            objects[x:x + 8] = ((int.from_bytes(row, "big") & mask) | (under & ~mask)).to_bytes(8, "big")
+
+        pixels = int.from_bytes(objects[8:COLS + 8], "big")
+        bg = int.from_bytes(self._line.translate(BG_OPAQUE), "big")
+        mask = int.from_bytes((pixels | bg).to_bytes(COLS, "big").translate(VISIBLE), "big")
+        shades = (self.OBP0.table[:4] + self.OBP1.table[:4]) * 2
+        sprites = int.from_bytes(objects[8:COLS + 8].translate(shades.ljust(256, b"\0")), "big")
+        sy = 22880 - (y*160)
+        screen = int.from_bytes(self._screenbuffer[sy:sy + COLS], "big")
+        self._screenbuffer[sy:sy + COLS] = ((sprites & mask) | (screen & ~mask)).to_bytes(COLS, "big")
 
     def clear_framebuffer(self) -> None:
-        self._screenbuffer[:] = [self.bg_palette[0] for _ in range(160*144)]
+        self._screenbuffer[:] = bytes([self.bg_palette[0]]) * (160*144)
 
     def frame(self) -> None:
-        # TODO: separate out - is this something for mmu?
-        for t in range(0x8000, 0x9800, 16):
-            for k in range(0, 16, 2):  # 2 bytes for each line
-                byte1 = self.vram[t + k - 0x8000]
-                byte2 = self.vram[t + k + 1 - 0x8000]
-                y = (t+k-0x8000)*4
+        # VBlank: the finished frame is handed over, unless someone is
+        # still reading the last one; then it's dropped and redrawn over
+        if not self.screens.swap():
+            return
+        self._screenbuffer = self.screens.back
+        self._ui.update_screen(self.screens.front)
+        for listener in self._frame_listeners:
+            listener(self.screens.front)
+
+    def add_frame_listener(self, listener: Callable[[bytearray], None]) -> None:
+        # Called at VBlank with each frame handed over. It may keep the
+        # buffer until the next call, or read it later under screens.lock.
+        self._frame_listeners.append(listener)
 
-                for x in range(8):
-                    colorcode = ((((byte2 >> (7-x)) & 0b1) << 1) + ((byte1 >> (7-x)) & 0b1))
-                    pos = x+y
 
-                    self._tiles[pos] = self.bg_palette.arr[colorcode]
-                    if colorcode == 0:
-                        self._sprites0[pos] = self.alpha
-                        self._sprites1[pos] = self.alpha
-                    else:
-                        self._sprites0[pos] = self.OBP0.arr[colorcode]
-                        self._sprites1[pos] = self.OBP1.arr[colorcode]
+class Screens():
+    # Double buffered screen. The PPU draws into back; front is the last
+    # finished frame. Readers on other threads hold lock while they read
+    # front. The PPU never waits for them: if lock is held at VBlank the
+    # buffers stay as they are.
 
-        self._ui.update_screen(self._screenbuffer)
+    def __init__(self) -> None:
+        self.back = bytearray([0xFF] * (160*144))
+        self.front = bytearray([0xFF] * (160*144))
+        self.lock = threading.Lock()
+        self.frames = 0  # frames handed over so far
+
+    def swap(self) -> bool:
+        if not self.lock.acquire(blocking=False):
+            return False
+        self.front, self.back = self.back, self.front
+        self.frames += 1
+        self.lock.release()
+        return True
+
+
+def make_ppu(interface: Frontend, mem: MMU, numpy: bool = False) -> PPU:
+    # The NumPy backend if asked for and NumPy is installed
+    if numpy:
+        try:
+            from ppu_numpy import NumpyPPU
+        except ImportError:
+            print("NumPy is not installed, using the Python PPU")
+        else:
+            return NumpyPPU(interface, mem)
+    return PPU(interface, mem)
 
 
 class Palette(Register):
 
     def __init__(self) -> None:
         self._value = 0
-        self.arr = (GLubyte * 4)(*(0xFF, 0xA0, 60, 00))
+        self.arr = bytearray((0xFF, 0xA0, 60, 00))
+        self.table = bytes(self.arr).ljust(256, b"\0")  # arr for bytes.translate
 
-    def __getitem__(self, val: int) -> GLubyte:
+    def __getitem__(self, val: int) -> int:
         return self.arr[val]
 
     @property
@@ -258,4 +517,5 @@ class Palette(Register):
         vals = [0] * 4
         for n in range(4):
             vals[n] = 255 - (85 * ((val >> n * 2) & 0b11))
-        self.arr = (GLubyte * 4)(*(vals))
+        self.arr = bytearray(vals)
+        self.table = bytes(vals).ljust(256, b"\0")
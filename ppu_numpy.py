@@ -0,0 +1,173 @@
+from operator import itemgetter
+from typing import Any, ByteString, List, Tuple
+
+import numpy as np
+
+from frontend import Frontend
+from mmu import MMU
+from ppu import COLS, PPU, ROWS, TILES
+
+# LCDC, SCY, SCX, BGP, OBP0, OBP1, WY and WX from MMU.IO: every register
+# rendering reads
+REGISTERS = itemgetter(0x40, 0x42, 0x43, 0x47, 0x48, 0x49, 0x4A, 0x4B)
+SHIFTS = np.arange(7, -1, -1, dtype=np.uint8)
+PIXELS = np.arange(8)
+
+
+class NumpyPPU(PPU):
+    # The same picture as PPU, drawn with NumPy. Scanlines are queued
+    # rather than drawn while nothing they depend on changes, and each
+    # run of them is drawn in one go: the whole frame at VBlank if the
+    # game leaves the registers, VRAM and OAM alone until then. The
+    # arrays here are what VRAM and OAM held when the queue started.
+
+    def __init__(self, interface: Frontend, mem: MMU) -> None:
+        super().__init__(interface, mem)
+        self._np_vram = np.frombuffer(mem.mem, np.uint8)[0x8000:0xA000]
+        self._np_tiles = np.zeros((TILES*8, 8), np.uint8)  # color codes by tile row
+        self._np_maps = np.zeros(0x800, np.intp)
+        self._np_oam = np.zeros((40, 4), np.intp)
+        # What the queued lines are drawn with: the registers, LCDC's
+        # bits and the palettes' shades when the queue started
+        self._state: Tuple[int, ...] = ()
+        self._lcdc = (False, False, False, False, False)
+        self._shades = (np.zeros(4, np.uint8),) * 3
+        self._queued: List[Tuple[int, int]] = []  # line, window row or -1
+
+    def render_scanline(self, y: int) -> None:
+        mem = self.mem
+        state = REGISTERS(self.io)
+        if state != self._state or mem.dirty_tiles or mem.dirty_rows or mem.oam_written:
+            self.flush()
+            self.sync(state)
+
+        lcdc = self._LCDC
+        row = -1
+        if lcdc.window_enable and self.io[0x4A] <= y and self.io[0x4B] - 7 < 160:
+            self.ly_window += 1
+            row = self.ly_window
+        self._queued.append((y, row))
+        if y == 143:
+            self.ly_window = -1
+
+    def sync(self, state: Tuple[int, ...]) -> None:
+        # Take in the registers and what has changed in VRAM and OAM
+        lcdc = self._LCDC
+        self._state = state
+        self._lcdc = (lcdc.bg_enable, lcdc.bg_tile_map_select, lcdc.windowmap_select,
+                      lcdc.tile_data_select, lcdc.sprite_height)
+        self._shades = (np.array(self.bg_palette.arr, np.uint8), np.array(self.OBP0.arr, np.uint8),
+                        np.array(self.OBP1.arr, np.uint8))
+        mem = self.mem
+        dirty = mem.take_dirty_tiles()
+        if dirty:
+            bits = np.unpackbits(np.frombuffer(dirty.to_bytes(TILES // 8, "little"), np.uint8),
+                                 bitorder="little")
+            rows = (np.nonzero(bits)[0][:, None] * 8 + np.arange(8)).ravel()
+            lo = self._np_vram[rows * 2]
+            hi = self._np_vram[rows * 2 + 1]
+            self._np_tiles[rows] = ((lo[:, None] >> SHIFTS) & 1) | ((hi[:, None] >> SHIFTS) & 1) << 1
+        if mem.take_dirty_rows():
+            self._np_maps[:] = self._np_vram[0x1800:]
+        if mem.oam_written:
+            mem.oam_written = False
+            self._np_oam[:] = np.frombuffer(self.OAM, np.uint8).reshape(40, 4)
+
+    def tile_rows(self, tiles: np.ndarray, ty: np.ndarray) -> np.ndarray:
+        # Row ty[n] of each map entry in tiles[n], side by side
+        if not self._lcdc[3]:  # signed tile numbers
+            tiles = (tiles ^ 0x80) + 128
+        rows: np.ndarray = self._np_tiles[tiles * 8 + ty[:, None]].reshape(len(ty), -1)
+        return rows
+
+    def flush(self) -> None:
+        # Draw the queued lines
+        if not self._queued:
+            return
+        ys = np.array([y for y, _ in self._queued])
+        window = np.array([row for _, row in self._queued])
+        self._queued = []
+        bg_enable, bg_map, window_map = self._lcdc[:3]
+        _, scy, scx, _, _, _, _, wx = self._state
+        wx -= 7
+        maps = self._np_maps
+
+        # Whole tile rows, 21 to cover the fine scroll, then cut to the line
+        codes = np.zeros((len(ys), COLS), np.uint8)
+        if bg_enable:
+            rows = (ys + scy) & 0xFF
+            cols = ((scx >> 3) + np.arange(21)) & 31
+            base = 0x400 if bg_map else 0
+            tiles = maps[base + (rows >> 3)[:, None] * 32 + cols]
+            fine = scx & 7
+            codes[:] = self.tile_rows(tiles, rows & 7)[:, fine:fine + COLS]
+        lines = np.nonzero(window >= 0)[0]
+        if len(lines):
+            split = max(wx, 0)
+            start = split - wx  # window column at split
+            fine = start & 7
+            rows = window[lines]
+            cols = ((start >> 3) + np.arange((fine + COLS - split + 7) // 8)) % 32
+            base = 0x400 if window_map else 0
+            tiles = maps[base + (rows // 8 % 32)[:, None] * 32 + cols]
+            codes[lines, split:] = self.tile_rows(tiles, rows % 8)[:, fine:fine + COLS - split]
+
+        screen = self._shades[0][codes]
+        self.draw_sprites(ys, codes, screen)
+        np.frombuffer(self._screenbuffer, np.uint8).reshape(ROWS, COLS)[143 - ys] = screen
+
+    def draw_sprites(self, ys: np.ndarray, codes: np.ndarray, screen: np.ndarray) -> None:
+        # As PPU.render_sprites: the first 10 sprites in OAM on each line,
+        # each pixel from the opaque one with the smallest X, then OAM index
+        oam = self._np_oam
+        height = 16 if self._lcdc[4] else 8
+        top = oam[:, 0] - 16
+        x = oam[:, 1]
+        on_line = (ys[:, None] >= top) & (ys[:, None] < top + height)
+        shown = on_line & (np.cumsum(on_line, axis=1) <= 10) & ((x > 0) & (x < COLS + 8))
+        line, sprite = np.nonzero(shown)
+        if not len(line):
+            return
+
+        attr = oam[sprite, 3]
+        ty = ys[line] - top[sprite]
+        ty = np.where(attr & 0b01000000, height - 1 - ty, ty)
+        tile = oam[sprite, 2] & (0b11111110 if height == 16 else 0xFF)
+        tx = np.where((attr & 0b00100000)[:, None], 7 - PIXELS, PIXELS)
+        pixel = self._np_tiles[(tile * 8 + ty)[:, None], tx]
+        px = x[sprite][:, None] - 8 + PIXELS
+        rank = np.empty(40, np.intp)
+        rank[np.lexsort((np.arange(40), x))] = np.arange(40)
+
+        # Each opaque pixel against the best rank at its place on screen
+        opaque = (pixel != 0) & (px >= 0) & (px < COLS)
+        target = (line[:, None] * COLS + px)[opaque]
+        ranks = np.broadcast_to(rank[sprite][:, None], px.shape)[opaque]
+        best = np.full(len(ys) * COLS, 40, np.intp)
+        np.minimum.at(best, target, ranks)
+        won = ranks == best[target]
+        target = target[won]
+        attr = np.broadcast_to(attr[:, None], px.shape)[opaque][won]
+        pixel = pixel[opaque][won]
+
+        visible = ~((attr & 0b10000000 != 0) & (codes.ravel()[target] != 0))
+        _, obp0, obp1 = self._shades
+        shades = np.where(attr & 0b10000, obp1[pixel], obp0[pixel])
+        screen.ravel()[target[visible]] = shades[visible]
+
+    def save_state(self) -> Tuple[Any, ...]:
+        self.flush()
+        return super().save_state()
+
+    def load_state(self, state: Tuple[Any, ...], screen: ByteString) -> None:
+        self._queued = []
+        self._state = ()
+        super().load_state(state, screen)
+
+    def clear_framebuffer(self) -> None:
+        self._queued = []
+        super().clear_framebuffer()
+
+    def frame(self) -> None:
+        self.flush()
+        super().frame()
@@ -0,0 +1,189 @@
+from __future__ import annotations
+from textwrap import indent
+from typing import Callable, Dict, List, Set, Tuple
+
+from instruction import SimpleInstr, decode
+from opcodes import FLAGS, JUMPS, REGISTERS, Op, inline_memory
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from cpu import CPU
+
+Block = Callable[["CPU"], int]
+
+MAX_INSTRS = 32
+# Blocks rewritten this many times are self-modifying code: it is
+# interpreted from then on rather than compiled again on every pass
+MAX_RECOMPILES = 4
+BOOTROM_BANK = 0x200  # Key used for ROM0 while the bootrom is overlaid
+
+class Recompiler():
+    # Optional execution engine: straight-line runs of instructions are
+    # turned into one Python function each, with the registers held in
+    # locals. Blocks are cached by (bank, PC) and dropped when the RAM they
+    # were compiled from is written.
+
+    def __init__(self, cpu: CPU, lazy_flags: bool = False) -> None:
+        self.cpu = cpu
+        self.mem = cpu.mem
+        self.mbc = cpu.mem.mbc
+        self.blocks: Dict[int, Block] = {}
+        # Times each RAM block was dropped for a write to its code
+        self.invalidations: Dict[int, int] = {}
+        # RAM address -> keys of blocks compiled from it
+        self._ram_blocks: Dict[int, Set[int]] = {}
+        # Cache key bank for each 16KB window of the address space
+        self.bank_of = [0, 1, 0, 0]
+        # Set when a running block may have had its code changed under it
+        self.dirty = False
+        self.compiled = 0
+        # Only compute flags that are read before being overwritten
+        self.lazy_flags = lazy_flags
+        self.flags_dropped = 0
+
+        self.mem.code_write = self.invalidate
+        self.mbc.add_bank_listener(self.bank_switched)
+        self.bank_switched()
+
+    def bank_switched(self) -> None:
+        self.bank_of[0] = BOOTROM_BANK if self.mbc.bootrom_mapped else self.mbc.rom_bank0
+        self.bank_of[1] = self.mbc.rom_bank1
+        self.dirty = True
+
+    def invalidate(self, addr: int) -> None:
+        invalidations = self.invalidations
+        for key in self._ram_blocks.pop(addr, ()):
+            if self.blocks.pop(key, None) is not None:
+                invalidations[key] = invalidations.get(key, 0) + 1
+        self.mem.code_map[addr] = 0
+        self.dirty = True
+
+    def run(self) -> None:
+        cpu = self.cpu
+        r = cpu.reg
+        blocks = self.blocks
+        bank_of = self.bank_of
+        invalidations = self.invalidations
+        mem = self.mem
+        s = cpu.scheduler
+        while cpu.remaining_cycles > 0:
+            if r.HALT:
+                s.skip(4)
+            else:
+                pc = r.PC
+                key = (bank_of[pc >> 14] << 16) | pc
+                block = blocks.get(key)
+                # Code off the 0xFF page reads as 0xFF during OAM DMA, as
+                # the interpreter sees it, whatever is cached for it
+                if ((mem.dma_active and pc < 0xFF00)
+                        or (block is None and invalidations.get(key, 0) >= MAX_RECOMPILES)):
+                    cycles = cpu.step()
+                else:
+                    block = block or self.compile(pc, key)
+                    self.dirty = False
+                    cycles = block(cpu)
+                # Not s.now += block(cpu): idle blocks move the clock
+                # themselves, and that would read it before they run
+                s.now += cycles
+
+            if s.now >= s.next:
+                s.run_events()
+                cpu.check_interrupts()
+
+    def compile(self, start: int, key: int) -> Block:
+        pc = start
+        code: List[Tuple[int, SimpleInstr, Op, int, int]] = []
+        while True:
+            i, op, arg, length = decode(self.mem, pc)
+            code.append((pc, i, op, arg, length))
+            nextpc = pc + length
+            if (op.exits or len(code) == MAX_INSTRS
+                    or (start < 0x8000 and (nextpc + 2) >> 14 != start >> 14)):
+                break
+            pc = nextpc
+        sources = self.flag_sources(code) if self.lazy_flags else [op.source for _, _, op, _, _ in code]
+
+        body: List[str] = []
+        live: Set[str] = set()     # registers the block needs loaded
+        defined: Set[str] = set()  # registers assigned so far
+        writes: Set[str] = set()
+        cycles = 0
+        for count, ((pc, i, op, arg, length), source) in enumerate(zip(code, sources), 1):
+            cycles += i.cycles
+            live |= op.live_in - defined
+            defined |= op.defined
+            writes |= op.writes
+            nextpc = pc + length
+
+            body.append(f"# {pc:04X} {i}")
+            if "n" in op.reads:
+                body.append(f"n = 0x{arg:X}")
+            if count == len(code):
+                body.append(f"PC = 0x{nextpc:04X}")
+                if op.taken:
+                    body.append("extra = 0")
+            body.append(inline_memory(source))
+            if op.syncs:
+                body.append("cpu.scheduler.sync()")
+            if count == len(code):
+                break
+            if op.stores:
+                # Memory writes may hit this block or switch its bank
+                store = "".join(f"    r.{n} = {n}\n" for n in REGISTERS if n in writes)
+                body.append(f"if s.dirty:\n{store}    r.PC = 0x{nextpc:04X}\n    return {cycles}")
+
+        # A taken branch at the end costs more than the table says
+        total = f"{cycles} + extra" if op.taken else f"{cycles}"
+
+        # A block that is a whole idle loop skips the passes it can
+        loop = None
+        if start < 0x8000 and self.mem[pc] in JUMPS:
+            loop = self.cpu.idle_loops.find(start, nextpc)
+        if loop is not None:
+            body.append(f"if PC == 0x{start:04X}:\n    idle.skip(loop, {total})")
+
+        src = (
+            f"def block(cpu):\n"
+            f"    r = cpu.reg\n"
+            f"    m = cpu.mem\n"
+            f"    p = m.read_pages\n"
+            f"    w = m.write_pages\n"
+            + "".join(f"    {n} = r.{n}\n" for n in REGISTERS if n in live)
+            + indent("\n".join(body), "    ") + "\n"
+            + "".join(f"    r.{n} = {n}\n" for n in REGISTERS if n in writes)
+            + f"    r.PC = PC\n"
+            + f"    return {total}\n"
+        )
+        namespace = {"s": self, "idle": self.cpu.idle_loops, "loop": loop}
+        exec(compile(src, f"<block {key:06X}>", "exec"), namespace)
+        block: Block = namespace["block"]  # type: ignore
+        self.compiled += 1
+        self.blocks[key] = block
+
+        if start >= 0x8000:
+            for addr in range(start, nextpc):
+                if 0xE000 <= addr < 0xFE00:
+                    addr -= 0x2000
+                self._ram_blocks.setdefault(addr, set()).add(key)
+                self.mem.code_map[addr] = 1
+        return block
+
+    def flag_sources(self, code: List[Tuple[int, SimpleInstr, Op, int, int]]) -> List[str]:
+        # Drop flag assignments that are overwritten before anything reads
+        # them. Flags are live wherever the block can be left.
+        live = set(FLAGS)
+        sources: List[str] = []
+        for n, (_, _, op, _, _) in enumerate(reversed(code)):
+            if n and op.stores:
+                live = set(FLAGS)
+            kept: List[str] = []
+            for text, flag, defines, reads in reversed(op.statements):
+                if flag is not None and flag not in live:
+                    self.flags_dropped += 1
+                    continue
+                live -= defines
+                live |= reads & set(FLAGS)
+                kept.append(text)
+            sources.append("\n".join(reversed(kept)) or "pass")
+        sources.reverse()
+        return sources
@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Callable
+from typing import Any, Tuple
 
 
 class Reg():
     # TODO: move into cpu
+    # Plain slots: the generated handlers read and write these directly.
+    # Pairs and F are views over them for everything else.
+    __slots__ = ("A", "B", "C", "D", "E", "H", "L", "PC", "SP",
+                 "fZ", "fN", "fH", "fC", "HALT", "STOP", "IME", "ei")
 
     def __init__(self) -> None:
         self.A = 1
@@ -28,16 +32,25 @@ class Reg():
         # extra
         self.ei = 0
 
+    def save_state(self) -> Tuple[Any, ...]:
+        # Everything, in __slots__ order, for savestates
+        return (self.A, self.B, self.C, self.D, self.E, self.H, self.L, self.PC, self.SP,
+                self.fZ, self.fN, self.fH, self.fC, self.HALT, self.STOP, self.IME, self.ei)
+
+    def load_state(self, state: Tuple[Any, ...]) -> None:
+        (self.A, self.B, self.C, self.D, self.E, self.H, self.L, self.PC, self.SP,
+         self.fZ, self.fN, self.fH, self.fC, self.HALT, self.STOP, self.IME, self.ei) = state
+
     @property
     def F(self) -> int:
-        return (int(self.fZ) << 7) + (int(self.fN) << 6) + (int(self.fH) << 5) + (int(self.fC) << 4)
+        return (self.fZ << 7) | (self.fN << 6) | (self.fH << 5) | (self.fC << 4)
 
     @F.setter
     def F(self, value: int) -> None:
-        self.fZ = value & (1 << 7) != 0
-        self.fN = value & (1 << 6) != 0
-        self.fH = value & (1 << 5) != 0
-        self.fC = value & (1 << 4) != 0
+        self.fZ = value & 0x80 != 0
+        self.fN = value & 0x40 != 0
+        self.fH = value & 0x20 != 0
+        self.fC = value & 0x10 != 0
 
     @property
     def strF(self) -> str:
@@ -45,17 +58,19 @@ class Reg():
 
     @property
     def AF(self) -> int:
-        return (self.A << 8) + self.F
+        return (self.A << 8) | (self.fZ << 7) | (self.fN << 6) | (self.fH << 5) | (self.fC << 4)
 
     @AF.setter
     def AF(self, value:int) -> None:
-        a, f = value.to_bytes(2, byteorder='big')
-        self.A = a
-        self.F = f
+        self.A = (value >> 8) & 0xFF
+        self.fZ = value & 0x80 != 0
+        self.fN = value & 0x40 != 0
+        self.fH = value & 0x20 != 0
+        self.fC = value & 0x10 != 0
 
     @property
     def BC(self) -> int:
-        return (self.B << 8) + self.C
+        return (self.B << 8) | self.C
 
     @BC.setter
     def BC(self, value:int) -> None:
@@ -64,7 +79,7 @@ class Reg():
 
     @property
     def DE(self) -> int:
-        return (self.D << 8) + self.E
+        return (self.D << 8) | self.E
 
     @DE.setter
     def DE(self, value:int) -> None:
@@ -73,7 +88,7 @@ class Reg():
 
     @property
     def HL(self) -> int:
-        return (self.H << 8) + self.L
+        return (self.H << 8) | self.L
 
     @HL.setter
     def HL(self, value:int) -> None:
@@ -96,21 +111,6 @@ class Register(ABC):
         pass
 
 
-class HandlerProxy(Register):
-    # Probably slow, don't use for hot path
-    def __init__(self, handler: Callable) -> None:
-        super().__init__()
-        self._handler = handler
-
-    @property
-    def value(self) -> int:
-        return 0
-
-    @value.setter
-    def value(self, val: int) -> None:
-        self._handler(val)
-
-
 class LCDC(Register):
     def __init__(self) -> None:
         super().__init__()
@@ -167,39 +167,3 @@ class STAT(Register):
         self.mode_0_hblank_enable = bool(val & 0b00001000)  # 3
         self.lyc_eq_ly            = bool(val & 0b00000100)  # 2
         self.mode                 = bool(val & 0b00000011)  # 0-1
-
-
-class DIV(Register):
-    def __init__(self) -> None:
-        super().__init__()
-        self._value = 0x00
-
-    @property
-    def value(self) -> int:
-        # Desn't really matter if this overflows until we read it,
-        # as we only ever check individual bits otherwise
-        self._value &= 0xFFFF
-        return self._value >> 8
-
-    @value.setter
-    def value(self, val: int) -> None:
-        # Any write to DIV resets it
-        self._value = 0x00
-
-
-class TIMA(Register):
-    def __init__(self) -> None:
-        super().__init__()
-        self._value = 0x00
-        # The previous DIV bit we're interested in
-        # so that we can identify a falling edge
-        self.prev = 0
-
-    @property
-    def value(self) -> int:
-        return self._value
-
-    @value.setter
-    def value(self, val: int) -> None:
-        self._value = val
-        self._counter = 0
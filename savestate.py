@@ -0,0 +1,80 @@
+import struct
+from typing import ByteString, List, Optional, Union
+
+from cpu import CPU
+from scheduler import Event
+
+# A savestate is the header, the fields below packed little-endian, then
+# all 64 KiB of MMU.mem and the frame being drawn. Bump VERSION whenever
+# any of it changes.
+MAGIC = b"AGBS"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+FIELDS = struct.Struct("<" + "".join((
+    "qq",                # CPU: remaining_cycles, frame_end
+    "7B2H7?B",           # Reg.save_state
+    "qqq?" + "q" * 4,    # Scheduler: now, next, last, synced, then each of events()
+    "B?BBHH?",           # MBC: mode, ram_enabled, upper_bank, ram_bank, ROM banks, bootrom
+    "B?",                # MMU: link_buffer, DMA active
+    "qqi",               # Timer: div_base, counted, tima
+    "iqiq?i",            # PPU: scancycle, frames, ly_window, last, drawing, skipped
+    "B8?B5?B",           # LCDC, STAT
+    "B4s" * 3,           # BGP, OBP0, OBP1: value and shades
+)))
+MEMORY = HEADER.size + FIELDS.size
+SCREEN = MEMORY + 0x10000
+SIZE = SCREEN + 160*144
+
+Buffer = Union[bytearray, memoryview]
+
+
+def events(cpu: CPU) -> List[Event]:
+    # Everything that can be on the scheduler, in the order saved
+    return [cpu.end_frame, cpu.ppu.update, cpu.timer.update, cpu.mem.dma_done]
+
+
+def save(cpu: CPU, buffer: Optional[Buffer] = None) -> Buffer:
+    # Into buffer if given, which must be SIZE bytes: keep one around to
+    # snapshot every frame without allocating
+    if buffer is None:
+        buffer = bytearray(SIZE)
+    elif len(buffer) != SIZE:
+        raise ValueError(f"savestate buffer is {len(buffer)} bytes, not {SIZE}")
+    HEADER.pack_into(buffer, 0, MAGIC, VERSION)
+    FIELDS.pack_into(buffer, HEADER.size, cpu.remaining_cycles, cpu.frame_end,
+                     *cpu.reg.save_state(), *cpu.scheduler.save_state(events(cpu)),
+                     *cpu.mem.mbc.save_state(), *cpu.mem.save_state(),
+                     *cpu.timer.save_state(), *cpu.ppu.save_state())
+    view = memoryview(buffer)
+    view[MEMORY:SCREEN] = cpu.mem.mem
+    view[SCREEN:] = cpu.ppu.screens.back
+    return buffer
+
+
+def load(cpu: CPU, data: ByteString) -> None:
+    if len(data) != SIZE:
+        raise ValueError(f"savestate is {len(data)} bytes, not {SIZE}")
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a savestate")
+    if version != VERSION:
+        raise ValueError(f"savestate version {version}, expected {VERSION}")
+    fields = FIELDS.unpack_from(data, HEADER.size)
+    view = memoryview(data)
+    cpu.remaining_cycles, cpu.frame_end = fields[0:2]
+    cpu.reg.load_state(fields[2:19])
+    cpu.scheduler.load_state(fields[19:27], events(cpu))
+    cpu.mem.mbc.load_state(fields[27:34])
+    cpu.mem.load_state(fields[34:36], view[MEMORY:SCREEN])
+    cpu.timer.load_state(fields[36:39])
+    cpu.ppu.load_state(fields[39:], view[SCREEN:])
+
+
+def save_file(cpu: CPU, path: str) -> None:
+    with open(path, "wb") as f:
+        f.write(save(cpu))
+
+
+def load_file(cpu: CPU, path: str) -> None:
+    with open(path, "rb") as f:
+        load(cpu, f.read())
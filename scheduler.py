@@ -0,0 +1,71 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+Event = Callable[[], None]
+
+
+class Scheduler():
+    # One clock for the whole machine, counted in cycles since power on.
+    # Devices schedule the cycle they next need to run at; the CPU executes
+    # instructions until `next` without touching them, then calls
+    # run_events(). Events fire at the first instruction boundary at or
+    # after their time, which is when the old per-instruction clock()
+    # would have noticed them.
+
+    def __init__(self) -> None:
+        self.now = 0
+        self.next = 0
+        self.last = 0  # when events last ran
+        self._events: Dict[Event, int] = {}
+        # Caught up whenever something they depend on is written
+        self._devices: List[Event] = []
+        self._synced = False
+
+    def schedule(self, event: Event, time: int) -> None:
+        self._events[event] = time
+        if time < self.next:
+            self.next = time
+
+    def cancel(self, event: Event) -> None:
+        self._events.pop(event, None)
+
+    def add_device(self, update: Event) -> None:
+        self._devices.append(update)
+
+    def save_state(self, events: List[Event]) -> Tuple[Any, ...]:
+        # For savestates: the clock, then when each of events is due, or -1
+        return (self.now, self.next, self.last, self._synced,
+                *(self._events.get(event, -1) for event in events))
+
+    def load_state(self, state: Tuple[Any, ...], events: List[Event]) -> None:
+        self.now, self.next, self.last, self._synced = state[:4]
+        self._events = {event: time for event, time in zip(events, state[4:]) if time >= 0}
+
+    def sync(self) -> None:
+        # Device state changed under the CPU (I/O write, EI, HALT...):
+        # run the devices again at the end of the current instruction
+        self._synced = True
+        self.next = self.now
+
+    def skip(self, step: int) -> None:
+        # Advance in whole steps to the first one at or after the next
+        # event, exactly where stepping one at a time would have stopped
+        self.now += max(step, (self.next - self.now + step - 1) // step * step)
+
+    def run_events(self) -> None:
+        now = self.now
+        self.last = now
+        if self._synced:
+            self._synced = False
+            for update in self._devices:
+                update()
+
+        events = self._events
+        while True:
+            due = [(time, event) for event, time in events.items() if time <= now]
+            if not due:
+                break
+            for time, event in sorted(due, key=lambda e: e[0]):
+                if events.get(event) == time:
+                    del events[event]
+                    event()
+        self.next = min(events.values(), default=now + 0x10000)
@@ -0,0 +1,110 @@
+from typing import Tuple
+
+from mmu import MMU, IE, IF, TAC, TMA
+from reg import Register
+
+# DIV bit whose falling edge ticks TIMA, by TAC & 0b11
+DIVIDERS = [1024, 16, 64, 256]
+
+
+class Timer():
+    # DIV and TIMA are worked out from the scheduler's clock when they are
+    # read or when TAC changes; the only event is TIMA overflowing.
+
+    def __init__(self, mem: MMU) -> None:
+        self.mem = mem
+        self.scheduler = mem.scheduler
+        self.div_base = 0  # scheduler time DIV was last reset
+        self.counted = 0   # DIV count TIMA has been brought up to
+        self.tima = 0
+
+        mem.add_io_handler(0xFF04, DIV(self))
+        mem.add_io_handler(0xFF05, TIMA(self))
+        mem.add_io_handler(TAC, TACRegister(self))
+        self.scheduler.add_device(self.update)
+
+    def save_state(self) -> Tuple[int, int, int]:
+        return (self.div_base, self.counted, self.tima)
+
+    def load_state(self, state: Tuple[int, int, int]) -> None:
+        self.div_base, self.counted, self.tima = state
+
+    def catch_up(self) -> None:
+        div = self.scheduler.now - self.div_base
+        tac = self.mem.IO[0x07]
+        if tac & 0b100:  # TIMA enabled
+            period = DIVIDERS[tac & 0b11] * 2
+            self.tima += div // period - self.counted // period
+        self.counted = div
+
+    def update(self) -> None:
+        self.catch_up()
+        mem = self.mem.mem
+        if self.tima > 0xFF:
+            self.tima = mem[TMA]
+            if mem[IE] & 0b00100:  # TIMER
+                mem[IF] |= 0b00100
+
+        tac = mem[TAC]
+        if tac & 0b100:
+            # Time of the tick that takes TIMA past 0xFF
+            period = DIVIDERS[tac & 0b11] * 2
+            ticks = self.counted // period + 0x100 - self.tima
+            self.scheduler.schedule(self.update, self.div_base + ticks * period)
+        else:
+            self.scheduler.cancel(self.update)
+
+    def reset_div(self) -> None:
+        self.catch_up()
+        tac = self.mem.IO[0x07]
+        if tac & 0b100 and self.counted & DIVIDERS[tac & 0b11]:
+            # Clearing DIV while the bit is set is a falling edge too
+            self.tima += 1
+        self.div_base = self.scheduler.now
+        self.counted = 0
+
+
+class DIV(Register):
+    def __init__(self, timer: Timer) -> None:
+        super().__init__()
+        self.timer = timer
+
+    @property
+    def value(self) -> int:
+        return ((self.timer.scheduler.now - self.timer.div_base) & 0xFFFF) >> 8
+
+    @value.setter
+    def value(self, val: int) -> None:
+        # Any write to DIV resets it
+        self.timer.reset_div()
+
+
+class TIMA(Register):
+    def __init__(self, timer: Timer) -> None:
+        super().__init__()
+        self.timer = timer
+
+    @property
+    def value(self) -> int:
+        self.timer.catch_up()
+        return self.timer.tima
+
+    @value.setter
+    def value(self, val: int) -> None:
+        self.timer.catch_up()
+        self.timer.tima = val
+
+
+class TACRegister(Register):
+    # Ticks so far are counted at the old rate before TAC changes
+    def __init__(self, timer: Timer) -> None:
+        super().__init__()
+        self.timer = timer
+
+    @property
+    def value(self) -> int:
+        return self.timer.mem.IO[0x07]
+
+    @value.setter
+    def value(self, val: int) -> None:
+        self.timer.catch_up()